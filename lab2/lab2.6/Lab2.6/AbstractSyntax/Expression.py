@@ -1,5 +1,8 @@
+import copy
+import operator
+import sys
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Union
+from typing import Callable, Iterator, List, Tuple, Union
 
 import Evaluator
 import TypeChecker
@@ -10,7 +13,66 @@ import Optimizer
 import AbstractSyntax
 
 
+def truncated_division(left: int, right: int) -> int:
+    # Trac42 integer division truncates towards 0, as the virtual machine does
+    quotient = abs(left) // abs(right)
+    if (left < 0) == (right < 0):
+        return quotient
+    return -quotient
+
+
+def truncated_modulus(left: int, right: int) -> int:
+    # a % b is compiled as a - a / b * b, the result has the sign of a
+    return left - truncated_division(left, right) * right
+
+
+# operators with the semantics of the compiled program, values were already typechecked, used by the optimizer to fold
+# constant operands and by the lowered expressions
+BINARY_OPERATORS = {
+    BinaryOperatorType.OR: operator.or_,
+    BinaryOperatorType.AND: operator.and_,
+    BinaryOperatorType.NOT_EQUALS: operator.ne,
+    BinaryOperatorType.LOWER_EQ: operator.le,
+    BinaryOperatorType.GREATER_EQUAL: operator.ge,
+    BinaryOperatorType.LOWER: operator.lt,
+    BinaryOperatorType.GREATER: operator.gt,
+    BinaryOperatorType.PLUS: operator.add,
+    BinaryOperatorType.MINUS: operator.sub,
+    BinaryOperatorType.MULTIPLY: operator.mul,
+    BinaryOperatorType.DIVIDE: truncated_division,
+    BinaryOperatorType.MODULUS: truncated_modulus,
+    BinaryOperatorType.EQUALS: operator.eq
+}
+# operators nested in a chain lowered into closures calling each other, a deeper chain runs as a list of steps
+LOWERED_CHAIN_DEPTH = 64
+
+
+# unary operators applied by the optimizer to constant operands
+FOLDED_UNARY_OPERATORS = {
+    UnaryOperatorType.NOT: operator.not_,
+    UnaryOperatorType.MINUS: operator.neg
+}
+
+
+def folded_expression(value: Union[int, bool]) -> "Expression":
+    # the constant node holding the result of a folded operator
+    if type(value) == bool:
+        return BooleanExpression(-1, -1, "true" if value else "false")
+    return NumberExpression(-1, -1, value)
+
+
+def parenthesized(expression: "Expression") -> "Expression":
+    # the expression inside any number of parentheses, parentheses only group the expression they contain
+    while type(expression) == BlockExpression and expression.get_expression() is not None and \
+            type(expression.get_expression()) != SeparatorExpression:
+        expression = expression.get_expression()
+    return expression
+
+
 class Expression(ABC):
+    # nodes have no __dict__, every class lists the attributes it sets in __slots__
+    __slots__ = ("__line", "__column")
+
     def __init__(self, line: int = None, column: int = None):
         self.__line = line
         self.__column = column
@@ -35,6 +97,18 @@ class Expression(ABC):
     def get_column(self):
         return self.__column
 
+    def get_children(self) -> tuple:
+        # the nodes right below this one, None for a missing part
+        return ()
+
+    def walk(self) -> Iterator[Union["AbstractSyntax.Expression", "AbstractSyntax.Statement"]]:
+        # this node and every node below it, walked with a stack, the tree is not changed
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in node.get_children() if child is not None)
+
     @abstractmethod
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
         pass
@@ -43,6 +117,20 @@ class Expression(ABC):
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         pass
 
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        # jumps to the label when the expression has the value jump_if and falls through otherwise, leaving the
+        # stack as it was, an expression without a form made of branches computes its value and tests it
+        self.compile(state, program)
+        if jump_if:
+            program.emit(Generator.Instruction(Generator.OpCode.NOT))
+        program.emit(Generator.Instruction(Generator.OpCode.BRF, target=label))
+
+    def has_side_effects(self) -> bool:
+        # an expression that can not be skipped without changing what the program does, a call can print and a
+        # division can stop the program
+        return True
+
     @abstractmethod
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
@@ -58,6 +146,14 @@ class Expression(ABC):
         if prepass is None:
             self.prepass(PrepassState())
 
+    @abstractmethod
+    def resolve(self, state: "Evaluator.ResolverState"):
+        pass
+
+    @abstractmethod
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        pass
+
     @abstractmethod
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         pass
@@ -70,41 +166,58 @@ class Expression(ABC):
 
 
 class IdentifierExpression(Expression):
+    __slots__ = ("__identifier", "__original_identifier", "__type", "__slot")
+
     def __init__(self, line: int, column: int, identifier: str):
         super().__init__(line, column)
-        self.__identifier = identifier
-        self.__original_identifier = identifier
+        # names are interned, lookups in the scope dictionaries compare them by identity first
+        self.__identifier = sys.intern(identifier)
+        self.__original_identifier = self.__identifier
         self.__type = None
+        self.__slot = None
 
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         # precedence 4, not really necessary, just appends the identifier string
-        pretty_builder.append(str(self.__identifier))
+        pretty_builder.append(self.__identifier)
 
     def prepass(self, prepass: PrepassState = None):
         if prepass is None:
             self.prepass(PrepassState())
             return
-        self.__identifier = prepass.rename(self.__identifier)
+        self.__identifier = sys.intern(prepass.rename(self.__identifier))
+
+    def get_name(self) -> str:
+        return self.__identifier
+
+    def resolve(self, state: "Evaluator.ResolverState"):
+        self.__slot = state.lookup(self.__identifier)
+
+    def get_slot(self) -> Union[int, None]:
+        return self.__slot
 
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(state)
-        if not state.has(str(self.__identifier)):
+        if not state.has(self.__slot):
             super().evaluatorException("INTERPRETATION ERROR: undeclared variable")
-        return state.lookup(str(self.__identifier)), Evaluator.ReturnType.CONTINUE
+        return state.lookup(self.__slot), Evaluator.ReturnType.CONTINUE
+
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        slot = self.__slot
+        return lambda frame: frame[slot]
 
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
         try:
-            self.__type = state.lookup_variable(str(self.__identifier))
+            self.__type = state.lookup_variable(self.__identifier)
             return self.__type
         except TypeChecker.TypecheckingStateException as e:
             super().typecheckException(str(e))
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        position = state.lookup(str(self.__identifier))
+        position = state.lookup(self.__identifier)
         if self.__type == TypeChecker.Types.INT:
             program.emit(Generator.Instruction(Generator.OpCode.RVALINT, argument=position))
         elif self.__type == TypeChecker.Types.BOOL:
@@ -113,10 +226,14 @@ class IdentifierExpression(Expression):
             raise Exception("Impossible type {0} expected int or bool".format(self.__type))
         return self.__type
 
+    def has_side_effects(self) -> bool:
+        return False
+
     def contains(self, identifier: str, unused: bool = False):
         return identifier == self.__identifier
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
+        state.node_visits += 1
         if state.is_del_variable(self.__identifier):
             if self.__type == TypeChecker.Types.INT:
                 return NumberExpression(super().get_line(), super().get_column(), 0)
@@ -136,6 +253,8 @@ class IdentifierExpression(Expression):
 
 
 class NumberExpression(Expression):
+    __slots__ = ("__num",)
+
     def __init__(self, line: int, column: int, num: int):
         super().__init__(line, column)
         self.__num = num
@@ -147,6 +266,9 @@ class NumberExpression(Expression):
     def prepass(self, prepass: PrepassState = None):
         pass
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        pass
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
@@ -155,6 +277,10 @@ class NumberExpression(Expression):
         except ValueError:
             super().evaluatorException("INTERPRETATION ERROR: expected integer value got {0}".format(self.__num))
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        value = int(self.__num)
+        return lambda frame: value
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -169,12 +295,18 @@ class NumberExpression(Expression):
         program.emit(Generator.Instruction(Generator.OpCode.PUSHINT, argument=int(self.__num)))
         return TypeChecker.Types.INT
 
+    def has_side_effects(self) -> bool:
+        return False
+
     # nothing to do in number expression
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
+        state.node_visits += 1
         return self
 
 
 class BooleanExpression(Expression):
+    __slots__ = ("__boolean",)
+
     def __init__(self, line: int, column: int, boolean: str):
         super().__init__(line, column)
         self.__boolean = boolean
@@ -186,6 +318,9 @@ class BooleanExpression(Expression):
     def prepass(self, prepass: PrepassState = None):
         pass
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        pass
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
@@ -195,6 +330,10 @@ class BooleanExpression(Expression):
             return True, Evaluator.ReturnType.CONTINUE
         super().evaluatorException("INTERPRETATION ERROR: expected boolean value got {0}".format(self.__boolean))
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        value = self.__boolean == "true"
+        return lambda frame: value
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -209,12 +348,37 @@ class BooleanExpression(Expression):
         program.emit(Generator.Instruction(Generator.OpCode.PUSHBOOL, argument=self.__boolean))
         return TypeChecker.Types.BOOL
 
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        # a constant guard always jumps or never does
+        state.is_return_last_function = False
+        if (self.__boolean == "true") == jump_if:
+            program.emit(Generator.Instruction(Generator.OpCode.BRA, target=label))
+
+    def has_side_effects(self) -> bool:
+        return False
+
     # nothing to do in boolean expression
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
+        state.node_visits += 1
         return self
 
 
+# name of the temporary slots, a space can not appear in an identifier
+TEMPORARY_NAME = "temporary {0}"
+# steps of the optimization of a chain of operators, a node is optimized, kept as it is or rebuilt from its operands
+OPTIMIZE = 0
+KEEP = 1
+REBUILD = 2
+# operators comparing their operands, a guard made of a comparison branches on it directly
+COMPARISON_OPERATORS = frozenset((BinaryOperatorType.EQUALS, BinaryOperatorType.NOT_EQUALS,
+                                  BinaryOperatorType.LOWER, BinaryOperatorType.LOWER_EQ,
+                                  BinaryOperatorType.GREATER, BinaryOperatorType.GREATER_EQUAL))
+
+
 class BinaryOperatorExpression(Expression):
+    __slots__ = ("__bin_op_type", "__left", "__right", "__expected_parameters_type", "__identifier_to_save")
+
     def __init__(self, line: int, column: int, bin_op_type: BinaryOperatorType, left: Expression, right: Expression):
         super().__init__(line, column)
         self.__bin_op_type = bin_op_type
@@ -223,6 +387,9 @@ class BinaryOperatorExpression(Expression):
         self.__expected_parameters_type = None
         self.__identifier_to_save = list()
 
+    def get_children(self) -> tuple:
+        return self.__left, self.__right
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 4, False)
@@ -262,106 +429,202 @@ class BinaryOperatorExpression(Expression):
         if prepass is None:
             self.prepass(PrepassState())
             return
-        self.__left.prepass(prepass)
-        self.__right.prepass(prepass)
+        for node, is_operator in self.__post_order():
+            if not is_operator:
+                node.prepass(prepass)
+
+    def resolve(self, state: "Evaluator.ResolverState"):
+        for node, is_operator in self.__post_order():
+            if not is_operator:
+                node.resolve(state)
+
+    def __post_order(self, expand_modulus: bool = True) -> Iterator[Tuple[Expression, bool]]:
+        # the operands of a chain of operators, each operator after its operands, found with a stack instead of
+        # recursion, chains can be deeper than the recursion limit, any expression other than an operator or
+        # parentheses is given as an operand
+        stack = [(self, False)]
+        while len(stack) > 0:
+            node, operands_done = stack.pop()
+            if operands_done:
+                yield node, True
+                continue
+            node = parenthesized(node)
+            if type(node) == BinaryOperatorExpression and \
+                    (expand_modulus or node.__bin_op_type != BinaryOperatorType.MODULUS or node is self):
+                stack.append((node, True))
+                stack.append((node.__right, False))
+                stack.append((node.__left, False))
+            else:
+                yield node, False
 
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
+        values = list()
+        for node, is_operator in self.__post_order():
+            if is_operator:
+                val2 = values.pop()
+                values[-1] = node.__apply(values[-1], val2)
+            else:
+                values.append(node.evaluate(state)[0])
+        return values[0], Evaluator.ReturnType.CONTINUE
 
-        val1, ret = self.__left.evaluate(state)
-        val2, ret = self.__right.evaluate(state)
-
+    def __apply(self, val1: Union[int, bool], val2: Union[int, bool]) -> Union[int, bool]:
         if self.__bin_op_type == BinaryOperatorType.OR:
             if type(val1) is not bool:
                 super().evaluatorException("INTERPRETATION ERROR: Expected boolean got {0}".format(type(val1)))
             if val1:
-                return True, Evaluator.ReturnType.CONTINUE
+                return True
             if type(val2) is not bool:
                 super().evaluatorException("INTERPRETATION ERROR: Expected boolean got {0}".format(type(val2)))
-            return val2, Evaluator.ReturnType.CONTINUE
+            return val2
         if self.__bin_op_type == BinaryOperatorType.AND:
             if type(val1) is not bool:
                 super().evaluatorException("INTERPRETATION ERROR: Expected boolean got {0}".format(type(val1)))
             if not val1:
-                return False, Evaluator.ReturnType.CONTINUE
+                return False
             if type(val2) is not bool:
                 super().evaluatorException("INTERPRETATION ERROR: Expected boolean got {0}".format(type(val2)))
-            return val1 and val2, Evaluator.ReturnType.CONTINUE
+            return val1 and val2
         if self.__bin_op_type == BinaryOperatorType.NOT_EQUALS:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 != val2, Evaluator.ReturnType.CONTINUE
+            return val1 != val2
         if self.__bin_op_type == BinaryOperatorType.LOWER_EQ:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 <= val2, Evaluator.ReturnType.CONTINUE
+            return val1 <= val2
         if self.__bin_op_type == BinaryOperatorType.GREATER_EQUAL:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 >= val2, Evaluator.ReturnType.CONTINUE
+            return val1 >= val2
         if self.__bin_op_type == BinaryOperatorType.LOWER:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 < val2, Evaluator.ReturnType.CONTINUE
+            return val1 < val2
         if self.__bin_op_type == BinaryOperatorType.GREATER:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 > val2, Evaluator.ReturnType.CONTINUE
+            return val1 > val2
         if self.__bin_op_type == BinaryOperatorType.PLUS:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 + val2, Evaluator.ReturnType.CONTINUE
+            return val1 + val2
         if self.__bin_op_type == BinaryOperatorType.MINUS:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 - val2, Evaluator.ReturnType.CONTINUE
+            return val1 - val2
         if self.__bin_op_type == BinaryOperatorType.MULTIPLY:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 * val2, Evaluator.ReturnType.CONTINUE
+            return val1 * val2
         if self.__bin_op_type == BinaryOperatorType.DIVIDE:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return int(val1 / val2), Evaluator.ReturnType.CONTINUE
+            return truncated_division(val1, val2)
         if self.__bin_op_type == BinaryOperatorType.MODULUS:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return int(val1 % val2), Evaluator.ReturnType.CONTINUE
+            return truncated_modulus(val1, val2)
         if self.__bin_op_type == BinaryOperatorType.EQUALS:
             if type(val1) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val1)))
             if type(val2) is not int:
                 super().evaluatorException("INTERPRETATION ERROR: Expected integer got {0}".format(type(val2)))
-            return val1 == val2, Evaluator.ReturnType.CONTINUE
+            return val1 == val2
         super().evaluatorException("INTERPRETATION ERROR: Invalid binary operator expression")
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        # both operands are always evaluated, left first, as evaluate does, the closures of a chain call the closures
+        # of its operands, a chain deeper than LOWERED_CHAIN_DEPTH runs its steps on a stack of values instead
+        steps = list(self.__post_order())
+        depths = list()
+        for node, is_operator in steps:
+            if is_operator:
+                right_depth = depths.pop()
+                depths[-1] = max(depths[-1], right_depth) + 1
+            else:
+                depths.append(0)
+        if depths[0] > LOWERED_CHAIN_DEPTH:
+            return BinaryOperatorExpression.__lower_steps(steps, state)
+        operands = list()
+        for node, is_operator in steps:
+            if is_operator:
+                right, right_closure = operands.pop()
+                left, left_closure = operands[-1]
+                operands[-1] = node, node.__lower_operator(left, left_closure, right, right_closure)
+            else:
+                operands.append((node, node.lower(state)))
+        return operands[0][1]
+
+    def __lower_operator(self, left: Expression, left_closure: Callable[[list], Union[int, bool, None]],
+                         right: Expression, right_closure: Callable[[list], Union[int, bool, None]]) \
+            -> Callable[[list], Union[int, bool, None]]:
+        binary_operator = BINARY_OPERATORS[self.__bin_op_type]
+        # constants and variables are read directly, without calling their closure
+        if type(right) in (NumberExpression, BooleanExpression):
+            right_value = right.evaluate(None)[0]
+            if type(left) == IdentifierExpression:
+                left_slot = left.get_slot()
+                return lambda frame: binary_operator(frame[left_slot], right_value)
+            return lambda frame: binary_operator(left_closure(frame), right_value)
+        if type(left) == IdentifierExpression and type(right) == IdentifierExpression:
+            left_slot = left.get_slot()
+            right_slot = right.get_slot()
+            return lambda frame: binary_operator(frame[left_slot], frame[right_slot])
+        return lambda frame: binary_operator(left_closure(frame), right_closure(frame))
+
+    @staticmethod
+    def __lower_steps(steps: List[Tuple[Expression, bool]], state: "Evaluator.LoweringState") \
+            -> Callable[[list], Union[int, bool, None]]:
+        # every operand is a closure and every operator pops the value of its right operand
+        lowered = [(None, BINARY_OPERATORS[node.__bin_op_type]) if is_operator else (node.lower(state), None)
+                   for node, is_operator in steps]
+
+        def run(frame: list) -> Union[int, bool]:
+            values = list()
+            for operand, binary_operator in lowered:
+                if binary_operator is None:
+                    values.append(operand(frame))
+                else:
+                    right = values.pop()
+                    values[-1] = binary_operator(values[-1], right)
+            return values[0]
+        return run
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
-        val1 = self.__left.typecheck(state)
-        val2 = self.__right.typecheck(state)
+        types = list()
+        for node, is_operator in self.__post_order():
+            if is_operator:
+                val2 = types.pop()
+                types[-1] = node.__check(types[-1], val2)
+            else:
+                types.append(node.typecheck(state))
+        return types[0]
 
+    def __check(self, val1: TypeChecker.Types, val2: TypeChecker.Types) -> TypeChecker.Types:
         if self.__bin_op_type == BinaryOperatorType.PLUS or self.__bin_op_type == BinaryOperatorType.MINUS or \
                 self.__bin_op_type == BinaryOperatorType.MULTIPLY or self.__bin_op_type == BinaryOperatorType.DIVIDE \
                 or self.__bin_op_type == BinaryOperatorType.MODULUS:
@@ -402,21 +665,82 @@ class BinaryOperatorExpression(Expression):
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
         if self.__bin_op_type == BinaryOperatorType.MODULUS:
+            self.__compile_modulus(state, program)
+            return self.__expected_parameters_type
+        # an operand that is a modulus stores its own operands in temporaries
+        for node, is_operator in self.__post_order(False):
+            if is_operator:
+                node.__emit_operator(program)
+            elif type(node) == BinaryOperatorExpression:
+                node.__compile_modulus(state, program)
+            else:
+                node.compile(state, program)
+        state.is_return_last_function = False
+        return self.__expected_parameters_type
+
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        state.is_return_last_function = False
+        if self.__bin_op_type in (BinaryOperatorType.AND, BinaryOperatorType.OR):
+            operands = self.__chain_operands()
+            # operands are always evaluated, as the evaluator does, an operand is skipped only when that changes
+            # nothing
+            if any(operand.has_side_effects() for operand in operands[1:]):
+                super().compile_branch(state, program, label, jump_if)
+                return
+            # a false operand decides a chain of &&, a true one decides a chain of ||
+            deciding = self.__bin_op_type == BinaryOperatorType.OR
+            if deciding == jump_if:
+                for operand in operands:
+                    operand.compile_branch(state, program, label, jump_if)
+                return
+            label_decided = state.rename_label("short_circuit")
+            for operand in operands[:-1]:
+                operand.compile_branch(state, program, label_decided, deciding)
+            operands[-1].compile_branch(state, program, label, jump_if)
+            program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_decided))
+        elif self.__bin_op_type in COMPARISON_OPERATORS:
+            # the comparison is tested as soon as it is computed, jumping when it is true tests its opposite
             self.__left.compile(state, program)
-        self.__left.compile(state, program)
-        self.__right.compile(state, program)
+            self.__right.compile(state, program)
+            if jump_if:
+                self.__emit_opposite_comparison(program)
+            else:
+                self.__emit_operator(program)
+            program.emit(Generator.Instruction(Generator.OpCode.BRF, target=label))
+            state.is_return_last_function = False
+        else:
+            super().compile_branch(state, program, label, jump_if)
+
+    def __chain_operands(self) -> List[Expression]:
+        # operands of the chain of operators equal to this one, left to right, through parentheses
+        operands = list()
+        stack = [self]
+        while len(stack) > 0:
+            node = parenthesized(stack.pop())
+            if type(node) == BinaryOperatorExpression and node.__bin_op_type == self.__bin_op_type:
+                stack.append(node.__right)
+                stack.append(node.__left)
+            else:
+                operands.append(node)
+        return operands
+
+    def has_side_effects(self) -> bool:
+        for node, is_operator in self.__post_order():
+            if is_operator:
+                if node.__bin_op_type in (BinaryOperatorType.DIVIDE, BinaryOperatorType.MODULUS):
+                    return True
+            elif node.has_side_effects():
+                return True
+        return False
+
+    def __emit_operator(self, program: "Generator.Trac42Program"):
         if self.__bin_op_type == BinaryOperatorType.OR:
             program.emit(Generator.Instruction(Generator.OpCode.OR))
         elif self.__bin_op_type == BinaryOperatorType.AND:
             program.emit(Generator.Instruction(Generator.OpCode.AND))
         elif self.__bin_op_type == BinaryOperatorType.NOT_EQUALS:
-            if self.__expected_parameters_type == TypeChecker.Types.INT:
-                program.emit(Generator.Instruction(Generator.OpCode.EQINT))
-            elif self.__expected_parameters_type == TypeChecker.Types.BOOL:
-                program.emit(Generator.Instruction(Generator.OpCode.EQBOOL))
-            else:
-                raise Exception("Expected parameters for not equal is {0} expected int or bool"
-                                .format(self.__expected_parameters_type))
+            self.__emit_equals(program)
             program.emit(Generator.Instruction(Generator.OpCode.NOT))
         elif self.__bin_op_type == BinaryOperatorType.LOWER_EQ:
             program.emit(Generator.Instruction(Generator.OpCode.LEINT))
@@ -436,22 +760,69 @@ class BinaryOperatorExpression(Expression):
             program.emit(Generator.Instruction(Generator.OpCode.MULT))
         elif self.__bin_op_type == BinaryOperatorType.DIVIDE:
             program.emit(Generator.Instruction(Generator.OpCode.DIV))
-        elif self.__bin_op_type == BinaryOperatorType.MODULUS:
-            program.emit(Generator.Instruction(Generator.OpCode.DIV))
-            self.__right.compile(state, program)
-            program.emit(Generator.Instruction(Generator.OpCode.MULT))
-            program.emit(Generator.Instruction(Generator.OpCode.SUB))
         elif self.__bin_op_type == BinaryOperatorType.EQUALS:
-            if self.__expected_parameters_type == TypeChecker.Types.INT:
-                program.emit(Generator.Instruction(Generator.OpCode.EQINT))
-            elif self.__expected_parameters_type == TypeChecker.Types.BOOL:
-                program.emit(Generator.Instruction(Generator.OpCode.EQBOOL))
-            else:
-                raise Exception("Expected parameters for not equal is {0} expected int or bool"
-                                .format(self.__expected_parameters_type))
+            self.__emit_equals(program)
         else:
             raise Exception("Unkenown operation {0}".format(self.__bin_op_type))
-        return self.__expected_parameters_type
+
+    def __emit_opposite_comparison(self, program: "Generator.Trac42Program"):
+        # a > b is false when a <= b is true, a >= b when a < b is true and a != b when a == b is true
+        if self.__bin_op_type == BinaryOperatorType.GREATER:
+            program.emit(Generator.Instruction(Generator.OpCode.LEINT))
+        elif self.__bin_op_type == BinaryOperatorType.GREATER_EQUAL:
+            program.emit(Generator.Instruction(Generator.OpCode.LTINT))
+        elif self.__bin_op_type == BinaryOperatorType.NOT_EQUALS:
+            self.__emit_equals(program)
+        else:
+            self.__emit_operator(program)
+            program.emit(Generator.Instruction(Generator.OpCode.NOT))
+
+    def __emit_equals(self, program: "Generator.Trac42Program"):
+        if self.__expected_parameters_type == TypeChecker.Types.INT:
+            program.emit(Generator.Instruction(Generator.OpCode.EQINT))
+        elif self.__expected_parameters_type == TypeChecker.Types.BOOL:
+            program.emit(Generator.Instruction(Generator.OpCode.EQBOOL))
+        else:
+            raise Exception("Expected parameters for not equal is {0} expected int or bool"
+                            .format(self.__expected_parameters_type))
+
+    def __compile_modulus(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
+        # a % b is a - a / b * b, every operand is evaluated once and stored in a temporary unless reading it
+        # again gives the same value, the left operand is read after the right one is evaluated
+        simple = (NumberExpression, IdentifierExpression)
+        left_temporary = type(self.__left) != NumberExpression and \
+            not (type(self.__left) == IdentifierExpression and type(self.__right) in simple)
+        right_temporary = type(self.__right) not in simple
+        left = self.__store_temporary(self.__left, state, program) if left_temporary else None
+        right = self.__store_temporary(self.__right, state, program) if right_temporary else None
+        for operand, position in ((self.__left, left), (self.__left, left), (self.__right, right)):
+            self.__load_operand(operand, position, state, program)
+        program.emit(Generator.Instruction(Generator.OpCode.DIV))
+        self.__load_operand(self.__right, right, state, program)
+        program.emit(Generator.Instruction(Generator.OpCode.MULT))
+        program.emit(Generator.Instruction(Generator.OpCode.SUB))
+        # temporaries are released in reverse order, nested expressions released theirs already
+        for position in (right, left):
+            if position is not None:
+                state.unbind(TEMPORARY_NAME.format(position))
+
+    @staticmethod
+    def __store_temporary(operand: Expression, state: "Generator.GeneratorState",
+                          program: "Generator.Trac42Program") -> int:
+        position = state.next_offset
+        state.bind(TEMPORARY_NAME.format(position))
+        program.emit(Generator.Instruction(Generator.OpCode.LVAL, position))
+        operand.compile(state, program)
+        program.emit(Generator.Instruction(Generator.OpCode.ASSINT))
+        return position
+
+    @staticmethod
+    def __load_operand(operand: Expression, position: Union[int, None], state: "Generator.GeneratorState",
+                       program: "Generator.Trac42Program"):
+        if position is None:
+            operand.compile(state, program)
+        else:
+            program.emit(Generator.Instruction(Generator.OpCode.RVALINT, position))
 
     def __optimize_left(self, state: "Optimizer.OptimizerState", expected_expression_type: type) -> Union[int, bool,
                                                                                                           None]:
@@ -460,7 +831,7 @@ class BinaryOperatorExpression(Expression):
             return ret
         elif type(self.__left) == IdentifierExpression:
             try:
-                return state.lookup_constant(str(self.__left))
+                return state.lookup_constant(self.__left.get_name())
             except Optimizer.OptimizerStateException:
                 pass
         return None
@@ -472,28 +843,76 @@ class BinaryOperatorExpression(Expression):
             return ret
         elif type(self.__right) == IdentifierExpression:
             try:
-                return state.lookup_constant(str(self.__right))
+                return state.lookup_constant(self.__right.get_name())
             except Optimizer.OptimizerStateException:
                 pass
         return None
 
     def contains(self, identifier: str, to_save: bool = False):
-        if hasattr(self.__left, "contains") and self.__left.contains(identifier):
+        if self.__operand_contains(self.__left, identifier):
             if "left" not in self.__identifier_to_save and to_save:
                     self.__identifier_to_save.append("left")
             return True
-        if hasattr(self.__right, "contains") and self.__right.contains(identifier):
+        if self.__operand_contains(self.__right, identifier):
             if "right" not in self.__identifier_to_save and to_save:
                     self.__identifier_to_save.append("right")
             return True
         return False
 
-    def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
-        if type(self.__left) != IdentifierExpression or "left" not in self.__identifier_to_save:
-            self.__left = self.__left.optimize(state)
-        if type(self.__right != IdentifierExpression) or "right" not in self.__identifier_to_save:
-            self.__right = self.__right.optimize(state)
+    @staticmethod
+    def __operand_contains(operand: Expression, identifier: str) -> bool:
+        # the operators of a chain are searched with a stack
+        stack = [operand]
+        while len(stack) > 0:
+            node = stack.pop()
+            if type(node) == BinaryOperatorExpression:
+                stack.append(node.__right)
+                stack.append(node.__left)
+            elif hasattr(node, "contains") and node.contains(identifier):
+                return True
+        return False
 
+    def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
+        # the chain of operators and parentheses is optimized with a stack, every node is rebuilt after its operands
+        results = list()
+        stack = [(self, OPTIMIZE)]
+        while len(stack) > 0:
+            node, step = stack.pop()
+            if step == KEEP:
+                results.append(node)
+            elif step == REBUILD and type(node) == BlockExpression:
+                results[-1] = node.with_expression(results[-1])
+            elif step == REBUILD:
+                right = results.pop()
+                results[-1] = node.__rebuild(state, results[-1], right)
+            elif type(node) == BinaryOperatorExpression:
+                state.node_visits += 1
+                stack.append((node, REBUILD))
+                stack.append((node.__right, OPTIMIZE))
+                # an identifier saved by an assignment keeps its value
+                if type(node.__left) == IdentifierExpression and "left" in node.__identifier_to_save:
+                    stack.append((node.__left, KEEP))
+                else:
+                    stack.append((node.__left, OPTIMIZE))
+            elif parenthesized(node) is not node:
+                state.node_visits += 1
+                stack.append((node, REBUILD))
+                stack.append((node.get_expression(), OPTIMIZE))
+            else:
+                results.append(node.optimize(state))
+        return results[0]
+
+    def __rebuild(self, state: "Optimizer.OptimizerState", left: Expression, right: Expression) -> Expression:
+        node = self
+        if left is not self.__left or right is not self.__right or len(self.__identifier_to_save) > 0:
+            # expressions are never changed in place, the caller can keep using the expression it optimized
+            node = copy.copy(self)
+            node.__left = left
+            node.__right = right
+            node.__identifier_to_save = list(self.__identifier_to_save)
+        return node.__fold(state)
+
+    def __fold(self, state: "Optimizer.OptimizerState") -> Expression:
         if self.__expected_parameters_type == TypeChecker.Types.INT:
             val1 = val2 = None
             if "left" not in self.__identifier_to_save:
@@ -519,13 +938,10 @@ class BinaryOperatorExpression(Expression):
                                       .format(super().get_line(), super().get_column()))
 
             if val1 is not None and val2 is not None:
-                ret = eval(str(val1) + str(self.__bin_op_type.value) + str(val2))
-                if type(ret) == bool:
-                    if ret:
-                        return BooleanExpression(-1, -1, "true")
-                    return BooleanExpression(-1, -1, "false")
-                else:
-                    return NumberExpression(-1, -1, ret)
+                if val2 == 0 and self.__bin_op_type in (BinaryOperatorType.DIVIDE, BinaryOperatorType.MODULUS):
+                    # the division by 0 is left to the program, the warning was already given
+                    return self
+                return folded_expression(BINARY_OPERATORS[self.__bin_op_type](val1, val2))
             return self
         else:
             val1 = val2 = None
@@ -558,25 +974,22 @@ class BinaryOperatorExpression(Expression):
                 if self.__bin_op_type == BinaryOperatorType.AND:
                     return BooleanExpression(super().get_line(), super().get_column(), False)
             if val1 is not None and val2 is not None:
-                operator = self.__bin_op_type.value
-                if operator == "||":
-                    operator = "or"
-                elif operator == "&&":
-                    operator = "and"
-                ret = eval(str(val1) + " " + str(operator) + " " + str(val2))
-                if ret:
-                    return BooleanExpression(-1, -1, "true")
-                return BooleanExpression(-1, -1, "false")
+                return folded_expression(BINARY_OPERATORS[self.__bin_op_type](val1, val2))
             return self
 
 
 class UnaryOperatorExpression(Expression):
+    __slots__ = ("__unary_op_type", "__expression", "__expected_type")
+
     def __init__(self, line: int, column: int, unary_op_type: UnaryOperatorType, expression: Expression):
         super().__init__(line, column)
         self.__unary_op_type = unary_op_type
         self.__expression = expression
         self.__expected_type = None
 
+    def get_children(self) -> tuple:
+        return self.__expression,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 4, False)
@@ -595,6 +1008,9 @@ class UnaryOperatorExpression(Expression):
             return
         self.__expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        self.__expression.resolve(state)
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
@@ -609,6 +1025,12 @@ class UnaryOperatorExpression(Expression):
             return -val, Evaluator.ReturnType.CONTINUE
         super().evaluatorException("INTERPRETATION ERROR: Invalid unary operator expression")
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        expression = self.__expression.lower(state)
+        if self.__unary_op_type == UnaryOperatorType.NOT:
+            return lambda frame: not expression(frame)
+        return lambda frame: -expression(frame)
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -634,45 +1056,65 @@ class UnaryOperatorExpression(Expression):
             program.emit(Generator.Instruction(Generator.OpCode.NEG))
         return self.__expected_type
 
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        if self.__unary_op_type == UnaryOperatorType.NOT:
+            # !x jumps where x jumps on the opposite value, no NOT is executed
+            state.is_return_last_function = False
+            self.__expression.compile_branch(state, program, label, not jump_if)
+        else:
+            super().compile_branch(state, program, label, jump_if)
+
+    def has_side_effects(self) -> bool:
+        return self.__expression.has_side_effects()
+
     def is_equivalent(self, expr: Expression):
         return expr.evaluate()[0] == self.__expression
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
-        if type(self.__expression) == IdentifierExpression:
-            if state.is_del_variable(str(self.__expression)):
-                self.__expression = self.__expression.optimize(state)
-        else:
-            self.__expression = self.__expression.optimize(state)
+        state.node_visits += 1
+        expression = self.__expression
+        if type(expression) != IdentifierExpression or state.is_del_variable(expression.get_name()):
+            expression = expression.optimize(state)
+        if expression is not self.__expression:
+            node = copy.copy(self)
+            node.__expression = expression
+            return node.__fold(state)
+        return self.__fold(state)
+
+    def __fold(self, state: "Optimizer.OptimizerState") -> Expression:
+        unary_operator = FOLDED_UNARY_OPERATORS[self.__unary_op_type]
         if self.__expected_type == TypeChecker.Types.INT:
             if type(self.__expression) == NumberExpression:
-                return NumberExpression(-1, -1, -self.__expression.evaluate(None))
+                return folded_expression(unary_operator(self.__expression.evaluate(None)[0]))
             elif type(self.__expression) == IdentifierExpression:
                 try:
-                    return NumberExpression(-1, -1, -state.lookup(str(self.__expression)))
+                    return folded_expression(unary_operator(state.lookup_constant(self.__expression.get_name())))
                 except Optimizer.OptimizerStateException:
                     pass
             return self
         else:
             if type(self.__expression) == BooleanExpression:
-                if not self.__expression.evaluate(None)[0]:
-                    return BooleanExpression(-1, -1, "true")
-                return BooleanExpression(-1, -1, "false")
-            elif type(self.__expression) == IdentifierExpression and state.is_del_variable(str(self.__expression)):
+                return folded_expression(unary_operator(self.__expression.evaluate(None)[0]))
+            elif type(self.__expression) == IdentifierExpression and state.is_del_variable(self.__expression.get_name()):
                 try:
-                    if not state.lookup_constant(str(self.__expression)):
-                        return BooleanExpression(-1, -1, "true")
-                    return BooleanExpression(-1, -1, "false")
+                    return folded_expression(unary_operator(state.lookup_constant(self.__expression.get_name())))
                 except Optimizer.OptimizerStateException:
                     pass
             return self
 
 
 class SeparatorExpression(Expression):
+    __slots__ = ("__current_expression", "__next_expression")
+
     def __init__(self, current_expression: Expression, next_expression: "SeparatorExpression" = None):
         super().__init__()
         self.__current_expression = current_expression
         self.__next_expression = next_expression
 
+    def get_children(self) -> tuple:
+        return self.__current_expression, self.__next_expression
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 5, False)
@@ -690,6 +1132,12 @@ class SeparatorExpression(Expression):
         if self.__next_expression is not None:
             self.__next_expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        separator = self
+        while separator is not None:
+            separator.__current_expression.resolve(state)
+            separator = separator.__next_expression
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
@@ -701,6 +1149,15 @@ class SeparatorExpression(Expression):
         val.insert(0, val2)
         return val, Evaluator.ReturnType.CONTINUE
 
+    def lower(self, state: "Evaluator.LoweringState") -> List[Callable[[list], Union[int, bool, None]]]:
+        # one closure for every expression of the list, in source order
+        expressions = list()
+        separator = self
+        while separator is not None:
+            expressions.append(separator.__current_expression.lower(state))
+            separator = separator.__next_expression
+        return expressions
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> List[TypeChecker.Types]:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -723,18 +1180,39 @@ class SeparatorExpression(Expression):
         type_list.append(expr_type)
         return val + 1, type_list
 
+    def get_expressions(self) -> List[Expression]:
+        # the expressions of the list, in source order
+        expressions = list()
+        separator = self
+        while separator is not None:
+            expressions.append(separator.__current_expression)
+            separator = separator.__next_expression
+        return expressions
+
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
-        self.__current_expression = self.__current_expression.optimize(state)
-        if self.__next_expression is not None:
-            self.__next_expression = self.__next_expression.optimize(state)
-        return self
+        state.node_visits += 1
+        current_expression = self.__current_expression.optimize(state)
+        next_expression = self.__next_expression
+        if next_expression is not None:
+            next_expression = next_expression.optimize(state)
+        if current_expression is self.__current_expression and next_expression is self.__next_expression:
+            return self
+        node = copy.copy(self)
+        node.__current_expression = current_expression
+        node.__next_expression = next_expression
+        return node
 
 
 class BlockExpression(Expression):
+    __slots__ = ("__expression",)
+
     def __init__(self, line: int, column: int, expression: SeparatorExpression):
         super().__init__(line, column)
         self.__expression = expression
 
+    def get_children(self) -> tuple:
+        return self.__expression,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 4, False)
@@ -749,6 +1227,10 @@ class BlockExpression(Expression):
         if self.__expression is not None:
             self.__expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        if self.__expression is not None:
+            self.__expression.resolve(state)
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
@@ -759,6 +1241,11 @@ class BlockExpression(Expression):
             ret = Evaluator.ReturnType.CONTINUE
         return val, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> List[Callable[[list], Union[int, bool, None]]]:
+        if self.__expression is not None:
+            return self.__expression.lower(state)
+        return list()
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> List[TypeChecker.Types]:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -772,18 +1259,47 @@ class BlockExpression(Expression):
             return self.__expression.compile(state, program)
         return 0, list()
 
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        expression = parenthesized(self)
+        if expression is self:
+            super().compile_branch(state, program, label, jump_if)
+        else:
+            state.is_return_last_function = False
+            expression.compile_branch(state, program, label, jump_if)
+
+    def has_side_effects(self) -> bool:
+        expression = parenthesized(self)
+        return expression is self or expression.has_side_effects()
+
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
-        self.__expression = self.__expression.optimize(state)
-        return self
+        state.node_visits += 1
+        return self.with_expression(self.__expression.optimize(state))
+
+    def get_expression(self) -> Union[Expression, SeparatorExpression, None]:
+        return self.__expression
+
+    def with_expression(self, expression: Union[Expression, SeparatorExpression]) -> "BlockExpression":
+        # the block itself when its expression did not change, expressions are never changed in place
+        if expression is self.__expression:
+            return self
+        node = copy.copy(self)
+        node.__expression = expression
+        return node
 
 
 class FunctionCallExpression(Expression):
+    __slots__ = ("__identifier", "__expression", "__expected_return_type")
+
     def __init__(self, line: int, column: int, identifier: IdentifierExpression, expression: BlockExpression):
         super().__init__(line, column)
         self.__identifier = identifier
         self.__expression = expression
         self.__expected_return_type = None
 
+    def get_children(self) -> tuple:
+        return self.__expression,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 4, False)
@@ -801,18 +1317,22 @@ class FunctionCallExpression(Expression):
         # self.__identifier.prepass(prepass)
         self.__expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        # the identifier is the name of a function, not a variable
+        self.__expression.resolve(state)
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
-        if str(self.__identifier) == "print":
+        if self.__identifier.get_name() == "print":
             val, ret = self.__expression.evaluate(state)
             for elem in val:
                 print(elem, end=" ")
             print()
             return None, Evaluator.ReturnType.CONTINUE
-        if not state.has_function(str(self.__identifier)):
-            super().evaluatorException("INTERPRETATION ERROR: Undefined function {0}".format(str(self.__identifier)))
-        fun = state.lookup_function(str(self.__identifier))
+        if not state.has_function(self.__identifier.get_name()):
+            super().evaluatorException("INTERPRETATION ERROR: Undefined function {0}".format(self.__identifier.get_name()))
+        fun = state.lookup_function(self.__identifier.get_name())
         params = fun[1]
         if params:
             params, ret = params.evaluate(state)
@@ -820,10 +1340,11 @@ class FunctionCallExpression(Expression):
         if (params is not None and passed_values is None) or (params is None and passed_values is not None) or \
                 (params is not None and passed_values is not None and len(params) != len(passed_values)):
             super().evaluatorException("INTERPRETATION ERROR: number of parameters not valid")
-        state.enter_scope()
+        state.enter_scope(fun[3])
         if passed_values is not None and params is not None:
+            # parameters are the first slots after the return value
             for i in range(len(passed_values)):
-                state.bind(params[i][1], passed_values[i])
+                state.bind(i + 1, passed_values[i])
         if fun[2]:
             res, ret = fun[2].evaluate(state)
             if ret == Evaluator.ReturnType.RETURN and type(res).__name__ != fun[0]:
@@ -831,23 +1352,51 @@ class FunctionCallExpression(Expression):
                 if provided_type == "NoneType":
                     provided_type = "void"
                 super().evaluatorException("INTERPRETATION ERROR: Return type of '{0}': {1}, provided {2} "
-                                           "instead".format(str(self.__identifier), fun[0], provided_type))
+                                           "instead".format(self.__identifier.get_name(), fun[0], provided_type))
         else:
             res = None
             ret = Evaluator.ReturnType.CONTINUE
         state.exit_scope()
         return res, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool, None]]:
+        # arguments are evaluated from the last one to the first, as evaluate and the generated code do
+        arguments = self.__expression.lower(state)
+        arguments_reversed = arguments[::-1]
+        if self.__identifier.get_name() == "print":
+            write = state.output.write
+            if len(arguments) == 1:
+                argument = arguments[0]
+                return lambda frame: write(str(argument(frame)) + " \n")
+
+            def print_values(frame: list):
+                values = [argument(frame) for argument in arguments_reversed]
+                write("".join(str(value) + " " for value in reversed(values)) + "\n")
+            return print_values
+        function = state.function_cell(self.__identifier.get_name())
+        if len(arguments) == 0:
+            return lambda frame: function[0]([None])
+        if len(arguments) == 1:
+            argument = arguments[0]
+            return lambda frame: function[0]([None, argument(frame)])
+
+        def call(frame: list):
+            values = [argument(frame) for argument in arguments_reversed]
+            values.append(None)
+            values.reverse()
+            return function[0](values)
+        return call
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
-        if str(self.__identifier) == "print":
+        if self.__identifier.get_name() == "print":
             self.__expression.typecheck(state)
             self.__expected_return_type = TypeChecker.Types.VOID
             return self.__expected_return_type
         try:
             # funct[0] == ret_Type; funct[1] == list(params_type)
-            funct = state.lookup_function(str(self.__identifier))
+            funct = state.lookup_function(self.__identifier.get_name())
             # args_type == list(types)
             args_type = self.__expression.typecheck(state)
             if len(funct[1]) != len(args_type):
@@ -862,7 +1411,7 @@ class FunctionCallExpression(Expression):
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        if str(self.__identifier) == "print":
+        if self.__identifier.get_name() == "print":
             unused, arguments_type = self.__expression.compile(state, program)
             for arg in reversed(arguments_type):
                 if arg == TypeChecker.Types.INT:
@@ -875,30 +1424,106 @@ class FunctionCallExpression(Expression):
                 # remove the parameter that was just printed
                 program.emit(Generator.Instruction(Generator.OpCode.POP, 1))
             return self.__expected_return_type
+        elif self.__identifier.get_name() in state.inlined_functions and \
+                len(self.__arguments()) == len(state.inlined_functions[self.__identifier.get_name()][1]):
+            return self.__compile_inline(state, program)
         else:
-            ret_type = state.get_ret_type(str(self.__identifier))
+            ret_type = state.get_ret_type(self.__identifier.get_name())
             if ret_type != TypeChecker.Types.VOID:
                 # allocate space for return value
                 program.emit(Generator.Instruction(Generator.OpCode.DECL, 1))
             # evaluate params in reverse order
             arguments_quantity, unused = self.__expression.compile(state, program)
             # call function
-            program.emit(Generator.Instruction(Generator.OpCode.BSR, target=str(self.__identifier)))
+            program.emit(Generator.Instruction(Generator.OpCode.BSR, target=self.__identifier.get_name()))
             if arguments_quantity > 0:
                 # remove all arguments
                 program.emit(Generator.Instruction(Generator.OpCode.POP, argument=arguments_quantity))
             return self.__expected_return_type
 
+    def get_name(self) -> str:
+        return self.__identifier.get_name()
+
+    def compile_tail_call(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
+        # the call is the value returned by the function it calls, the arguments replace the parameters and the body
+        # starts again in the same frame, the arguments are evaluated from the last one to the first as for a call and
+        # all of them before the first parameter is assigned, since they can read the parameters they replace
+        arguments = self.__arguments()
+        for index in range(len(arguments) - 1, -1, -1):
+            # parameters are above the return address and the old frame pointer
+            program.emit(Generator.Instruction(Generator.OpCode.LVAL, 2 + index))
+            arguments[index].compile(state, program)
+        for index in range(len(arguments)):
+            program.emit(Generator.Instruction(self.__assign_op_code(state.function_parameters[index])))
+        if state.tail_call_drops_frame:
+            # the size of the frame is known once the whole function is compiled
+            program.emit(Generator.Instruction(Generator.OpCode.POP, 0))
+        state.tail_calls.append(len(program))
+        program.emit(Generator.Instruction(Generator.OpCode.BRA, target=state.tail_call_label))
+        state.is_return_last_function = True
+
+    @staticmethod
+    def __assign_op_code(param_type: "TypeChecker.Types") -> "Generator.OpCode":
+        if param_type == TypeChecker.Types.INT:
+            return Generator.OpCode.ASSINT
+        return Generator.OpCode.ASSBOOL
+
+    def __arguments(self) -> List[Expression]:
+        if self.__expression.get_expression() is None:
+            return list()
+        return self.__expression.get_expression().get_expressions()
+
+    def __compile_inline(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
+        # the body of the function is compiled in place of the call, the arguments are evaluated from the last one to
+        # the first as for a call and stored in temporaries that the body reads as its parameters, its own names are
+        # the only ones it sees, a return leaves its value on the stack and jumps after the body
+        unused, params, body, unused, unused = state.inlined_functions[self.__identifier.get_name()]
+        temporaries = list()
+        for argument, (param_type, param_name) in reversed(list(zip(self.__arguments(), params))):
+            position = state.next_offset
+            state.bind(TEMPORARY_NAME.format(position))
+            program.emit(Generator.Instruction(Generator.OpCode.LVAL, position))
+            argument.compile(state, program)
+            if param_type == TypeChecker.Types.INT:
+                program.emit(Generator.Instruction(Generator.OpCode.ASSINT))
+            else:
+                program.emit(Generator.Instruction(Generator.OpCode.ASSBOOL))
+            temporaries.append((param_name, position))
+        caller_offsets = state.offset_map
+        caller_end_label = state.inline_end_label
+        state.offset_map = {param_name: position for param_name, position in temporaries}
+        state.inline_end_label = state.rename_label("end_inline")
+        if body is not None:
+            body.compile(state, program)
+        program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=state.inline_end_label))
+        state.offset_map = caller_offsets
+        state.inline_end_label = caller_end_label
+        # temporaries are released in reverse order
+        for unused, position in reversed(temporaries):
+            state.unbind(TEMPORARY_NAME.format(position))
+        state.is_return_last_function = False
+        return self.__expected_return_type
+
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
-        self.__expression = self.__expression.optimize(state)
-        return self
+        state.node_visits += 1
+        expression = self.__expression.optimize(state)
+        if expression is self.__expression:
+            return self
+        node = copy.copy(self)
+        node.__expression = expression
+        return node
 
 
 class SingleExpression(Expression):
+    __slots__ = ("__expression",)
+
     def __init__(self, line: int, column: int, expression: Expression):
         super().__init__(line, column)
         self.__expression = expression
 
+    def get_children(self) -> tuple:
+        return self.__expression,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             self.pretty(pretty_builder, 3, False)
@@ -912,12 +1537,22 @@ class SingleExpression(Expression):
             return
         self.__expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState"):
+        self.__expression.resolve(state)
+
     def evaluate(self, state: EvaluationState = None):
         if state is None:
             return self.evaluate(EvaluationState())
         res, ret = self.__expression.evaluate(state)
         return res, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], None]:
+        expression = self.__expression.lower(state)
+
+        def run(frame: list):
+            expression(frame)
+        return run
+
     def typecheck(self, state: TypeChecker.TypecheckingState = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -925,9 +1560,13 @@ class SingleExpression(Expression):
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        self.__expression.compile(state, program)
+        expression_type = self.__expression.compile(state, program)
+        if expression_type == TypeChecker.Types.INT or expression_type == TypeChecker.Types.BOOL:
+            # the value of the expression is not used
+            program.emit(Generator.Instruction(Generator.OpCode.POP, 1))
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Expression", "AbstractSyntax.Statement"]:
+        state.node_visits += 1
         self.__expression = self.__expression.optimize(state)
         if type(self.__expression) in (NumberExpression, BooleanExpression, type(None), IdentifierExpression):
             return AbstractSyntax.EmptyStatement()
@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Union, Tuple, Any
-import copy
+from typing import Callable, Iterator, List, Union, Tuple, Any
 
 import Evaluator
 import TypeChecker
@@ -10,6 +9,9 @@ import Optimizer
 
 
 class Statement(ABC):
+    # nodes have no __dict__, every class lists the attributes it sets in __slots__
+    __slots__ = ("__line", "__column")
+
     def __init__(self, line: int = None, column: int = None):
         self.__line = line
         self.__column = column
@@ -34,6 +36,18 @@ class Statement(ABC):
                 msg += " column: " + str(self.__column)
         raise TypeChecker.TypecheckerException(msg)
 
+    def get_children(self) -> tuple:
+        # the nodes right below this one, None for a missing part
+        return ()
+
+    def walk(self) -> Iterator[Union["Statement", "AbstractSyntax.Expression"]]:
+        # this node and every node below it, walked with a stack, the tree is not changed
+        stack = [self]
+        while len(stack) > 0:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in node.get_children() if child is not None)
+
     @abstractmethod
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
         pass
@@ -58,6 +72,16 @@ class Statement(ABC):
             self.prepass(Evaluator.PrepassState())
             return
 
+    # gives every variable its slot in the call frame of its function, runs after prepass
+    @abstractmethod
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        pass
+
+    # the returned closure runs the statement on a call frame, it returns True when a return statement was executed
+    @abstractmethod
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        pass
+
     @abstractmethod
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         pass
@@ -70,6 +94,8 @@ class Statement(ABC):
 
 
 class IdentifierList(Statement):
+    __slots__ = ("__identifier_type", "__identifier", "__next")
+
     def __init__(self, line: int, column: int, identifier_type: str, identifier: "AbstractSyntax.Expression",
                  next_identifier: "IdentifierList" = None):
         super().__init__(line, column)
@@ -93,17 +119,28 @@ class IdentifierList(Statement):
         if self.__next is not None:
             self.__next.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        # parameters are bound in order
+        state.bind(self.__identifier.get_name())
+        self.__identifier.resolve(state)
+        if self.__next is not None:
+            self.__next.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             self.evaluate(Evaluator.Evaluator.EvaluationState())
         if self.__next is None:
-            val = [self.__identifier_type, str(self.__identifier)]
+            val = [self.__identifier_type, self.__identifier.get_name()]
             return [val], Evaluator.ReturnType.CONTINUE
         val, ret = self.__next.evaluate(state)
-        val2 = [self.__identifier_type, str(self.__identifier)]
+        val2 = [self.__identifier_type, self.__identifier.get_name()]
         val.insert(0, val2)
         return val, Evaluator.ReturnType.CONTINUE
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        raise Evaluator.EvaluatorException("Cannot have identifier list inside function, "
+                                           "nested functions are not allowed")
+
     # noinspection PyArgumentList
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> List[Tuple[TypeChecker.Types, str]]:
         if state is None:
@@ -111,21 +148,21 @@ class IdentifierList(Statement):
         if self.__next is None:
             val = TypeChecker.Types(self.__identifier_type)  # required string, correctly given
             try:
-                state.lookup_variable(str(self.__identifier))
+                state.lookup_variable(self.__identifier.get_name())
                 super().typecheckException(
-                    "TYPECHECK ERROR: Variable {0} already defined".format(str(self.__identifier)))
+                    "TYPECHECK ERROR: Variable {0} already defined".format(self.__identifier.get_name()))
             except TypeChecker.TypecheckingStateException:
-                state.bind_variable(str(self.__identifier), val)
-            val = (val, str(self.__identifier))
+                state.bind_variable(self.__identifier.get_name(), val)
+            val = (val, self.__identifier.get_name())
             return [val]
         val = self.__next.typecheck(state)
         val2 = TypeChecker.Types(self.__identifier_type)
         try:
-            state.lookup_variable(str(self.__identifier))
-            super().typecheckException("TYPECHECK ERROR: Variable {0} already defined".format(str(self.__identifier)))
+            state.lookup_variable(self.__identifier.get_name())
+            super().typecheckException("TYPECHECK ERROR: Variable {0} already defined".format(self.__identifier.get_name()))
         except TypeChecker.TypecheckingStateException:
-            state.bind_variable(str(self.__identifier), val2)
-        val2 = (val2, str(self.__identifier))
+            state.bind_variable(self.__identifier.get_name(), val2)
+        val2 = (val2, self.__identifier.get_name())
         val.insert(0, val2)
         return val
 
@@ -135,10 +172,13 @@ class IdentifierList(Statement):
 
     # nothing to change in identifier list
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         return self
 
 
 class FunctionDeclaration(Statement):
+    __slots__ = ("__return_type", "__identifier", "__params", "__body", "__decl_count", "__frame_size")
+
     def __init__(self, line: int, column: int, return_type: str, identifier: "AbstractSyntax.Expression",
                  params: IdentifierList = None,
                  body: Statement = None):
@@ -148,6 +188,10 @@ class FunctionDeclaration(Statement):
         self.__params = params
         self.__body = body
         self.__decl_count = 0
+        self.__frame_size = 1
+
+    def get_children(self) -> tuple:
+        return self.__body,
 
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
@@ -191,14 +235,30 @@ class FunctionDeclaration(Statement):
             prepass.exit_scope()
         prepass.exit_scope()
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        state.enter_function()
+        if type(self.__params) == list:
+            # parameters were already replaced by the typechecker
+            for unused, name in self.__params:
+                state.bind(name)
+        elif self.__params is not None:
+            self.__params.resolve(state)
+        if self.__body is not None:
+            self.__body.resolve(state)
+        self.__frame_size = state.frame_size
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
         if self.__params is None:
             self.__params = list()
-        state.bind_function(str(self.__identifier), (self.__return_type, self.__params, self.__body))
+        state.bind_function(self.__identifier.get_name(),
+                            (self.__return_type, self.__params, self.__body, self.__frame_size))
         return None, Evaluator.ReturnType.CONTINUE
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        raise Evaluator.EvaluatorException("Cannot declare nested functions")
+
     # noinspection PyArgumentList
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> TypeChecker.Types:
         if state is None:
@@ -210,10 +270,10 @@ class FunctionDeclaration(Statement):
         elif type(self.__params) != list:
             self.__params = list()
         try:
-            state.lookup_function(str(self.__identifier))
+            state.lookup_function(self.__identifier.get_name())
             super().typecheckException("TYPECHECK EXCEPTION: Function with same name already declared")
         except TypeChecker.TypecheckingStateException:
-            state.bind_function(str(self.__identifier),
+            state.bind_function(self.__identifier.get_name(),
                                 (ret_type, self.__params, self.__body, super().get_line(), super().get_column()))
         state.exit_scope()
         return ret_type
@@ -221,12 +281,16 @@ class FunctionDeclaration(Statement):
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         raise Exception("Cannot declare nested functions")
 
+    def get_name(self) -> str:
+        return self.__identifier.get_name()
+
     def get_decl_count(self) -> dict:
         ret = dict()
-        ret[str(self.__identifier)]=self.__decl_count
+        ret[self.__identifier.get_name()]=self.__decl_count
         return ret
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         # bind function parameters
         index_to_remove = list()
         # noinspection PyTypeChecker
@@ -241,7 +305,7 @@ class FunctionDeclaration(Statement):
                 state.bind_param(self.__params[i][1], "int")
             else:
                 # noinspection PyUnresolvedReferences
-                state.bind(self.__params[i][1], "bool")
+                state.bind_param(self.__params[i][1], "bool")
             state.del_costant(self.__params[i][1])
         for i in index_to_remove[::-1]:
             # noinspection PyUnresolvedReferences
@@ -254,37 +318,58 @@ class FunctionDeclaration(Statement):
 
 
 class SequenceStatement(Statement):
-    def __init__(self, head: Statement, tail: Statement = None):
+    __slots__ = ("__statements", "__decl_list")
+
+    def __init__(self, statements: List[Statement] = None):
         super().__init__()
-        self.__head = head
-        self.__tail = tail
+        # the statements in order, the parser appends to the list instead of nesting sequences, so that every pass
+        # walks them in a loop
+        if statements is None:
+            statements = list()
+        self.__statements = statements
         self.__decl_list = dict()
 
+    def append(self, statement: Statement) -> "SequenceStatement":
+        self.__statements.append(statement)
+        return self
+
+    def get_children(self) -> tuple:
+        return tuple(self.__statements)
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 0, False)
-        if self.__head is not None and self.__head != "" and type(self.__head) != EmptyStatement:
-            self.__head.pretty(pretty_builder, outer_precedence, opposite)
-        if self.__tail is not None and self.__tail != "" and type(self.__tail) != EmptyStatement:
-            if self.__head is not None and self.__head != "":
+        first = True
+        for statement in self.__statements:
+            if type(statement) == EmptyStatement:
+                continue
+            if not first:
                 pretty_builder.new_line()
-            self.__tail.pretty(pretty_builder, outer_precedence, opposite)
+            first = False
+            statement.pretty(pretty_builder, outer_precedence, opposite)
 
     def prepass(self, prepass: Evaluator.PrepassState = None):
         if prepass is None:
             self.prepass(Evaluator.PrepassState())
             return
-        self.__head.prepass(prepass)
-        if self.__tail is not None and self.__tail != "":
-            self.__tail.prepass(prepass)
+        for statement in self.__statements:
+            statement.prepass(prepass)
+
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        if state is None:
+            state = Evaluator.ResolverState()
+        for statement in self.__statements:
+            statement.resolve(state)
 
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
+            self.resolve()
             state = Evaluator.Evaluator.EvaluationState()
             self.evaluate(state)
             if not state.has_function("main"):
                 super().evaluatorException("INTERPRETATION ERROR: Required function 'main' not found")
             main = state.lookup_function("main")
+            state.enter_scope(main[3])
             if main[2]:
                 val, ret = main[2].evaluate(state)
                 provided_type = type(val).__name__
@@ -294,11 +379,24 @@ class SequenceStatement(Statement):
                     super().evaluatorException("INTERPRETATION ERROR: Return type of 'main': {0}, provided {1} "
                                                "instead".format(main[0], provided_type))
             return
-        val, ret = self.__head.evaluate(state)
-        if self.__tail is not None and self.__tail != "" and ret != Evaluator.ReturnType.RETURN:
-            val, ret = self.__tail.evaluate(state)
+        val, ret = None, Evaluator.ReturnType.CONTINUE
+        for statement in self.__statements:
+            val, ret = statement.evaluate(state)
+            if ret == Evaluator.ReturnType.RETURN:
+                break
         return val, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        statements = [statement.lower(state) for statement in self.__statements if type(statement) != EmptyStatement]
+        if len(statements) == 1:
+            return statements[0]
+
+        def run(frame: list):
+            for statement in statements:
+                if statement(frame):
+                    return True
+        return run
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> \
             Union[Tuple[bool, "TypeChecker.TypecheckingState"], List[
                 Union["TypeChecker.Types", Any]], "TypeChecker.Types"]:
@@ -339,72 +437,59 @@ class SequenceStatement(Statement):
                                                                              fun[4]))
                 state.exit_scope()
             return True, state
+        # the returns found in the statements, in order
         ret = list()
-        res = self.__head.typecheck(state)
-        if type(res) == dict and type(ret) != list:
-            ret = list()
-            ret.append(res)
-        elif type(res) == dict and type(ret) == list:
-            ret.append(res)
-        elif type(res) == list and type(ret) != list:
-            ret = res
-        elif type(res) == list and type(ret) == list:
-            # noinspection PyTypeChecker
-            for x in res:  # type is list
-                ret.append(x)
-        if self.__tail is not None and self.__tail != "":
-            res = self.__tail.typecheck(state)
-            if type(res) == dict and type(ret) != list:
-                ret = list()
-                ret.append(res)
-            elif type(res) == dict and type(ret) == list:
+        for statement in self.__statements:
+            res = statement.typecheck(state)
+            if type(res) == dict:
                 ret.append(res)
-            elif type(res) == list and type(ret) != list:
-                ret = res
-            elif type(res) == list and type(ret) == list:
-                # noinspection PyTypeChecker
-                for x in res:  # type is list
-                    ret.append(x)
+            elif type(res) == list:
+                ret.extend(res)
         return ret
 
+    def get_statements(self) -> List[Statement]:
+        return list(self.__statements)
+
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        self.__head.compile(state, program)
-        if self.__tail is not None and self.__tail != "":
-            self.__tail.compile(state, program)
+        for statement in self.__statements:
+            statement.compile(state, program)
 
     def get_decl_count(self):
         return self.__decl_list
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         if state.ignore_next > 0:
             return EmptyStatement()
-        if self.__head is not None and self.__head != "":
-            # noinspection PyUnresolvedReferences
-            self.__head = self.__head.optimize(state)
-        if hasattr(self.__head, "get_decl_count"):
-            var = self.__head.get_decl_count()
-            for name in var.keys():
-                self.__decl_list[name] = var[name]
-        if state.is_last_return:
-            self.__tail = EmptyStatement()
-        if state.ignore_next > 0:
-            if type(self.__tail) != ReturnStatement:
-                self.__tail = EmptyStatement()
-            return self
-        if self.__tail is not None and self.__tail != "":
-            self.__tail = self.__tail.optimize(state)
-        if hasattr(self.__tail, "get_decl_count"):
-            var = self.__tail.get_decl_count()
-            for name in var.keys():
-                self.__decl_list[name] = var[name]
-        if (self.__head is None or self.__head == "" or type(self.__head) == EmptyStatement) \
-                and (self.__tail is None or self.__tail == "" or type(self.__tail) == EmptyStatement):
+        statements = self.__statements
+        for i in range(len(statements)):
+            if i > 0 and state.is_last_return:
+                # nothing runs after the return
+                statements[i] = EmptyStatement()
+            if i > 0 and state.ignore_next > 0:
+                # nothing runs after an infinite loop, except a return statement that keeps the function typed
+                for j in range(i, len(statements)):
+                    if type(statements[j]) != ReturnStatement:
+                        statements[j] = EmptyStatement()
+                return self
+            if statements[i] is not None:
+                # noinspection PyUnresolvedReferences
+                statements[i] = statements[i].optimize(state)
+            if hasattr(statements[i], "get_decl_count"):
+                var = statements[i].get_decl_count()
+                for name in var.keys():
+                    self.__decl_list[name] = var[name]
+        # an empty statement optimizes to None
+        self.__statements = [statement for statement in statements if statement is not None]
+        if all(type(statement) == EmptyStatement for statement in self.__statements):
             return EmptyStatement()
         return self
 
 
 class AssignmentStatement(Statement):
+    __slots__ = ("__identifier", "__expr", "__assignment_type")
+
     def __init__(self, line: int, column: int, identifier: "AbstractSyntax.Expression",
                  expr: "AbstractSyntax.Expression"):
         super().__init__(line, column)
@@ -412,6 +497,12 @@ class AssignmentStatement(Statement):
         self.__expr = expr
         self.__assignment_type = None
 
+    def get_name(self) -> str:
+        return self.__identifier.get_name()
+
+    def get_children(self) -> tuple:
+        return self.__identifier, self.__expr
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 4, False)
@@ -433,25 +524,43 @@ class AssignmentStatement(Statement):
         self.__expr.prepass(prepass)
         self.__identifier.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        self.__expr.resolve(state)
+        self.__identifier.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
         val, ret = self.__expr.evaluate(state)
         if val is None:
             super().evaluatorException("INTERPRETATION ERROR: Expected value got void")
-        current_val = state.lookup(str(self.__identifier))
+        slot = self.__identifier.get_slot()
+        current_val = None
+        if slot is not None:
+            current_val = state.lookup(slot)
         if type(current_val) != type(val):
             super().evaluatorException("INTERPRETATION ERROR: Expected {0} got {1} instead".format(
                 type(current_val).__name__, type(val).__name__))
-        state.bind(str(self.__identifier), val)
+        state.bind(slot, val)
         return val, Evaluator.ReturnType.CONTINUE
 
+    # assignments are expressions, the parser wraps them in a single expression when used as statements
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[int, bool]]:
+        slot = self.__identifier.get_slot()
+        expression = self.__expr.lower(state)
+
+        def run(frame: list):
+            value = expression(frame)
+            frame[slot] = value
+            return value
+        return run
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
         val = self.__expr.typecheck(state)
         try:
-            var_type = state.lookup_variable(str(self.__identifier))
+            var_type = state.lookup_variable(self.__identifier.get_name())
             if var_type != val:
                 super().typecheckException("TYPECHECK ERROR: Expected {0} got {1}".format(var_type.value, val.value))
             self.__assignment_type = var_type
@@ -461,7 +570,7 @@ class AssignmentStatement(Statement):
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        position = state.lookup(str(self.__identifier))
+        position = state.lookup(self.__identifier.get_name())
         program.emit(Generator.Instruction(Generator.OpCode.LVAL, position))
         self.__expr.compile(state, program)
         if self.__assignment_type == TypeChecker.Types.INT:
@@ -470,12 +579,25 @@ class AssignmentStatement(Statement):
         elif self.__assignment_type == TypeChecker.Types.BOOL:
             program.emit(Generator.Instruction(Generator.OpCode.ASSBOOL))
             program.emit(Generator.Instruction(Generator.OpCode.RVALBOOL, position))
+        return self.__assignment_type
+
+    # an assignment used as an operand of a condition, the value is stored before it is tested
+    def compile_branch(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program", label: str,
+                       jump_if: bool):
+        self.compile(state, program)
+        if jump_if:
+            program.emit(Generator.Instruction(Generator.OpCode.NOT))
+        program.emit(Generator.Instruction(Generator.OpCode.BRF, target=label))
+
+    def has_side_effects(self) -> bool:
+        return True
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
-        if hasattr(self.__expr, "contains") and self.__expr.contains(str(self.__identifier), True):
-            state.del_costant(str(self.__identifier))
-            state.bind_first_use(str(self.__identifier), Optimizer.FirstUseType.READ)
-        state.bind_first_use(str(self.__identifier), Optimizer.FirstUseType.WRITE)
+        state.node_visits += 1
+        if hasattr(self.__expr, "contains") and self.__expr.contains(self.__identifier.get_name(), True):
+            state.del_costant(self.__identifier.get_name())
+            state.bind_first_use(self.__identifier.get_name(), Optimizer.FirstUseType.READ)
+        state.bind_first_use(self.__identifier.get_name(), Optimizer.FirstUseType.WRITE)
         for identifier in state.get_constant_identifiers():
             if hasattr(self.__expr, "contains") and self.__expr.contains(str(identifier), False):
                 state.bind_first_use(str(identifier), Optimizer.FirstUseType.READ)
@@ -483,21 +605,23 @@ class AssignmentStatement(Statement):
         if type(self.__expr) in (AbstractSyntax.BooleanExpression, AbstractSyntax.NumberExpression):
             val = self.__expr.evaluate()[0]
             if type(val) == int:
-                state.bind(str(self.__identifier), val, "int")
+                state.bind(self.__identifier.get_name(), val, "int")
             else:
-                state.bind(str(self.__identifier), val, "bool")
+                state.bind(self.__identifier.get_name(), val, "bool")
         # TODO check if assignment is like x=x;
-        if type(self.__expr) == AbstractSyntax.IdentifierExpression and str(self.__identifier) == str(self.__expr):
+        if type(self.__expr) == AbstractSyntax.IdentifierExpression and self.__identifier.get_name() == self.__expr.get_name():
             return EmptyStatement()
         try:
-            state.lookup_constant(str(self.__identifier))
-            state.del_costant(str(self.__identifier))
+            state.lookup_constant(self.__identifier.get_name())
+            state.del_costant(self.__identifier.get_name())
         except Optimizer.OptimizerStateException:
             pass
         return self
 
 
 class BlockStatement(Statement):
+    __slots__ = ("__statement",)
+
     def __init__(self, line: int, column: int, statement: Statement):
         super().__init__(line, column)
         self.__statement = statement
@@ -507,6 +631,9 @@ class BlockStatement(Statement):
             return True
         return False
 
+    def get_children(self) -> tuple:
+        return self.__statement,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 3, False)
@@ -522,6 +649,10 @@ class BlockStatement(Statement):
             self.__statement.prepass(prepass)
             prepass.exit_scope()
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        if self.__statement is not None and self.__statement != "":
+            self.__statement.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
@@ -530,6 +661,11 @@ class BlockStatement(Statement):
             return val, ret
         return None, Evaluator.ReturnType.CONTINUE
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        if self.is_empty_statement():
+            return EmptyStatement().lower(state)
+        return self.__statement.lower(state)
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -545,12 +681,13 @@ class BlockStatement(Statement):
         if self.__statement is not None:
             current_offset = state.next_offset
             self.__statement.compile(state, program)
-            offset = current_offset - state.next_offset
-            if offset > 0:
+            # the slots of the variables of the block stay in the frame declared by the function, they are only
+            # reused by the variables and temporaries bound after the block
+            if current_offset != state.next_offset:
                 state.unbind_by_offset(current_offset)
-                program.emit(Generator.Instruction(Generator.OpCode.POP, argument=offset))
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         self.__statement = self.__statement.optimize(state)
         if type(self.__statement) == EmptyStatement:
             return EmptyStatement()
@@ -558,6 +695,8 @@ class BlockStatement(Statement):
 
 
 class IfStatement(Statement):
+    __slots__ = ("__expression", "__statement", "__else_statement")
+
     def __init__(self, line: int, column: int, expression: "AbstractSyntax.Expression", statement: SequenceStatement,
                  else_statement: SequenceStatement = None):
         super().__init__(line, column)
@@ -565,6 +704,9 @@ class IfStatement(Statement):
         self.__statement = statement
         self.__else_statement = else_statement
 
+    def get_children(self) -> tuple:
+        return self.__expression, self.__statement, self.__else_statement
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 3, False)
@@ -596,6 +738,13 @@ class IfStatement(Statement):
         if self.__else_statement is not None:
             self.__else_statement.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        self.__expression.resolve(state)
+        if self.__statement is not None:
+            self.__statement.resolve(state)
+        if self.__else_statement is not None:
+            self.__else_statement.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
@@ -611,6 +760,24 @@ class IfStatement(Statement):
             res, ret = self.__else_statement.evaluate(state)
         return res, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        expression = self.__expression.lower(state)
+        statement = EmptyStatement().lower(state)
+        if self.__statement is not None:
+            statement = self.__statement.lower(state)
+        if self.__else_statement is None:
+            def run(frame: list):
+                if expression(frame):
+                    return statement(frame)
+            return run
+        else_statement = self.__else_statement.lower(state)
+
+        def run_else(frame: list):
+            if expression(frame):
+                return statement(frame)
+            return else_statement(frame)
+        return run_else
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> Union[TypeChecker.Types, List[dict]]:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -650,13 +817,12 @@ class IfStatement(Statement):
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        # if check
-        self.__expression.compile(state, program)
         label_end = state.rename_label("end_if")
         label_else = label_end
         if self.__else_statement is not None:
             label_else = state.rename_label("else")
-        program.emit(Generator.Instruction(Generator.OpCode.BRF, target=label_else))
+        # if check, jumping to the else branch as soon as the guard is known to be false
+        self.__expression.compile_branch(state, program, label_else, False)
         # then body
         self.__statement.compile(state, program)
         program.emit(Generator.Instruction(Generator.OpCode.BRA, target=label_end))
@@ -667,6 +833,7 @@ class IfStatement(Statement):
         program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_end))
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         state.set_lookup_variable()
         self.__expression = self.__expression.optimize(state)
         state.unset_lookup_variable()
@@ -682,11 +849,16 @@ class IfStatement(Statement):
 
 
 class WhileStatement(Statement):
+    __slots__ = ("__expression", "__body")
+
     def __init__(self, line: int, column: int, expression: "AbstractSyntax.Expression", body: "BlockStatement"):
         super().__init__(line, column)
         self.__expression = expression
         self.__body = body
 
+    def get_children(self) -> tuple:
+        return self.__expression, self.__body
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 3, False)
@@ -708,6 +880,10 @@ class WhileStatement(Statement):
         self.__expression.prepass(prepass)
         self.__body.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        self.__expression.resolve(state)
+        self.__body.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
@@ -727,6 +903,16 @@ class WhileStatement(Statement):
                     continue
             return res, ret
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        expression = self.__expression.lower(state)
+        body = self.__body.lower(state)
+
+        def run(frame: list):
+            while expression(frame):
+                if body(frame):
+                    return True
+        return run
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -756,19 +942,34 @@ class WhileStatement(Statement):
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
         label_while = state.rename_label("while_do")
-        label_end = state.rename_label("end_while")
-        program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_while))
-        # guard of while
-        self.__expression.compile(state, program)
-        program.emit(Generator.Instruction(Generator.OpCode.BRF, target=label_end))
+        label_guard = state.rename_label("while_guard")
+        # the guard is tested after the body, entering the loop jumps to it, an iteration runs the body and the
+        # guard, which branches back to the body while it is true
+        program.emit(Generator.Instruction(Generator.OpCode.BRA, target=label_guard))
         # body of while
+        program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_while))
         self.__body.compile(state, program)
-        if not state.is_return_last_function:
-            program.emit(Generator.Instruction(Generator.OpCode.BRA, target=label_while))
-        program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_end))
+        # guard of while
+        program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_guard))
+        self.__expression.compile_branch(state, program, label_while, True)
+        # the loop ends when the guard is false, even if its body ends with a return
+        state.is_return_last_function = False
+
+    def get_expression(self) -> "AbstractSyntax.Expression":
+        return self.__expression
+
+    def get_body(self) -> "BlockStatement":
+        return self.__body
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
-        old_expression = copy.deepcopy(self.__expression)
+        state.node_visits += 1
+        # the value a variable has before the loop is not its value in the guard, in the body or after the loop once
+        # the body assigns it
+        for node in self.__body.walk():
+            if type(node) == AssignmentStatement:
+                state.assign_in_loop(node.get_name())
+        # optimizing an expression returns a new node when it changes, the guard before folding is kept as it is
+        old_expression = self.__expression
         self.__expression = self.__expression.optimize(state)
         try:
             if not self.__expression.evaluate()[0]:
@@ -795,11 +996,16 @@ class WhileStatement(Statement):
 
 
 class ReturnStatement(Statement):
+    __slots__ = ("__expression", "__expected_return_type")
+
     def __init__(self, line: int, column: int, expression: "AbstractSyntax.Expression" = None):
         super().__init__(line, column)
         self.__expression = expression
         self.__expected_return_type = None
 
+    def get_children(self) -> tuple:
+        return self.__expression,
+
     def pretty(self, pretty_builder, outer_precedence: int = None, opposite: bool = None) -> None:
         if outer_precedence is None and opposite is None:
             return self.pretty(pretty_builder, 3, False)
@@ -816,6 +1022,10 @@ class ReturnStatement(Statement):
         if self.__expression is not None:
             self.__expression.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        if self.__expression is not None:
+            self.__expression.resolve(state)
+
     def evaluate(self, state: Evaluator.Evaluator.EvaluationState = None):
         if state is None:
             return self.evaluate(Evaluator.Evaluator.EvaluationState())
@@ -824,6 +1034,16 @@ class ReturnStatement(Statement):
             return val, Evaluator.ReturnType.RETURN
         return None, Evaluator.ReturnType.RETURN
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        if self.__expression is None:
+            return lambda frame: True
+        expression = self.__expression.lower(state)
+
+        def run(frame: list):
+            frame[0] = expression(frame)
+            return True
+        return run
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> dict:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
@@ -838,6 +1058,17 @@ class ReturnStatement(Statement):
         return {"type": ret, "return": ret}
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
+        if state.inline_end_label is not None:
+            # return of an inlined call, its value is left on the stack after the body
+            if self.__expression is not None:
+                self.__expression.compile(state, program)
+            program.emit(Generator.Instruction(Generator.OpCode.BRA, target=state.inline_end_label))
+            state.is_return_last_function = True
+            return
+        if state.tail_call_label is not None and type(self.__expression) == AbstractSyntax.FunctionCallExpression \
+                and self.__expression.get_name() == state.function_name:
+            self.__expression.compile_tail_call(state, program)
+            return
         if self.__expression is not None:
             return_offset = state.offset_map['return']
             program.emit(Generator.Instruction(Generator.OpCode.LVAL, argument=return_offset))
@@ -853,6 +1084,7 @@ class ReturnStatement(Statement):
         state.is_return_last_function = True
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         if self.__expression is not None:
             self.__expression = self.__expression.optimize(state)
         state.is_last_return = True
@@ -860,6 +1092,8 @@ class ReturnStatement(Statement):
 
 
 class DefinitionStatement(Statement):
+    __slots__ = ("__variable_type", "__identifier")
+
     def __init__(self, line: int, column: int, variable_type: str, identifier: "AbstractSyntax.Expression"):
         super().__init__(line, column)
         self.__variable_type = variable_type
@@ -878,36 +1112,48 @@ class DefinitionStatement(Statement):
         if prepass is None:
             self.prepass(Evaluator.PrepassState())
             return
-        prepass.bind(str(self.__identifier))
+        prepass.bind(self.__identifier.get_name())
         self.__identifier.prepass(prepass)
 
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        state.bind(self.__identifier.get_name())
+        self.__identifier.resolve(state)
+
     def evaluate(self, state: Evaluator.EvaluationState = None):
         if self.__variable_type == "int":
             val = 0
         else:
             val = False
-        state.bind(str(self.__identifier), val)
+        state.bind(self.__identifier.get_slot(), val)
         val, ret = self.__identifier.evaluate(state)
         return val, Evaluator.ReturnType.CONTINUE
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        slot = self.__identifier.get_slot()
+        value = 0 if self.__variable_type == "int" else False
+
+        def run(frame: list):
+            frame[slot] = value
+        return run
+
     def typecheck(self, state: "TypeChecker.TypecheckingState" = None) -> TypeChecker.Types:
         if state is None:
             return self.typecheck(TypeChecker.TypecheckingState())
         try:
-            state.lookup_variable(str(self.__identifier))
+            state.lookup_variable(self.__identifier.get_name())
             super().typecheckException(
-                "TYPECHECK ERROR: Variable '{0}' already declared".format(str(self.__identifier)))
+                "TYPECHECK ERROR: Variable '{0}' already declared".format(self.__identifier.get_name()))
         except TypeChecker.TypecheckingStateException:
-            state.bind_variable(str(self.__identifier), TypeChecker.Types(self.__variable_type))
+            state.bind_variable(self.__identifier.get_name(), TypeChecker.Types(self.__variable_type))
         return TypeChecker.Types(self.__variable_type)  # type is string
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
         state.is_return_last_function = False
-        state.bind(str(self.__identifier))
-        check = state.lookup_fist_use(str(self.__identifier))
+        state.bind(self.__identifier.get_name())
+        check = state.lookup_fist_use(self.__identifier.get_name())
         if check is not None and check == Optimizer.FirstUseType.READ:
             # assigning base value
-            position = state.lookup(str(self.__identifier))
+            position = state.lookup(self.__identifier.get_name())
             program.emit(Generator.Instruction(Generator.OpCode.LVAL, argument=position))
             if self.__variable_type == "int":
                 program.emit(Generator.Instruction(Generator.OpCode.PUSHINT, argument=0))
@@ -917,19 +1163,23 @@ class DefinitionStatement(Statement):
                 program.emit(Generator.Instruction(Generator.OpCode.ASSBOOL))
 
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
-        if state.is_del_variable(str(self.__identifier)):
+        state.node_visits += 1
+        if state.is_del_variable(self.__identifier.get_name()):
             return EmptyStatement()
         state.inc_decl()
         if self.__variable_type == "int":
-            state.bind(str(self.__identifier), None, "int")
+            state.bind(self.__identifier.get_name(), None, "int")
         else:
-            state.bind(str(self.__identifier), None, "bool")
+            state.bind(self.__identifier.get_name(), None, "bool")
         return self
 
 
 # only used in variable optimization
 class EmptyStatement(Statement):
+    __slots__ = ()
+
     def optimize(self, state: "Optimizer.OptimizerState") -> Union["Statement", "AbstractSyntax.Expression"]:
+        state.node_visits += 1
         pass
 
     def compile(self, state: "Generator.GeneratorState", program: "Generator.Trac42Program"):
@@ -941,6 +1191,12 @@ class EmptyStatement(Statement):
     def evaluate(self, state: Evaluator.EvaluationState = None):
         pass
 
+    def lower(self, state: "Evaluator.LoweringState") -> Callable[[list], Union[bool, None]]:
+        return lambda frame: None
+
+    def resolve(self, state: "Evaluator.ResolverState" = None):
+        pass
+
     def prepass(self, prepass: Evaluator.PrepassState = None):
         pass
 
@@ -0,0 +1,87 @@
+# Time to write the listing of a large linked program with the streaming writer against the previous
+# Trac42Program.__str__, which concatenated one line at a time and compared the op code of every instruction
+# with a chain of ==. Run from the Lab2.6 folder with:
+#   python -m Benchmark.AssemblyWriterBenchmark [instructions ...]
+import io
+import sys
+import time
+
+from Generator import Instruction, OpCode, Trac42Program
+
+# the previous implementation is only run up to this size
+LEGACY_MAX_INSTRUCTIONS = 1000000
+
+
+def legacy_instruction_str(instruction: Instruction) -> str:
+    op_code = instruction.get_op_code()
+    if op_code == OpCode.LABEL:
+        return "[" + str(instruction.target) + "]"
+    elif op_code == OpCode.BSR or op_code == OpCode.BRF or op_code == OpCode.BRA:
+        return str(op_code.value) + " " + str(instruction.target)
+    else:
+        out = str(op_code.value) + " "
+        if not (op_code == OpCode.ASSINT or op_code == OpCode.ASSBOOL or op_code == OpCode.ADD
+                or op_code == OpCode.SUB or op_code == OpCode.EQINT or op_code == OpCode.LTINT
+                or op_code == OpCode.WRITEINT or op_code == OpCode.WRITEBOOL or
+                op_code == OpCode.LINK or op_code == OpCode.UNLINK or op_code == OpCode.RTS or
+                op_code == OpCode.END or op_code == OpCode.NOT or op_code == OpCode.NEG or
+                op_code == OpCode.OR or op_code == OpCode.LEINT or op_code == OpCode.MULT or
+                op_code == OpCode.DIV or op_code == OpCode.AND):
+            out += str(instruction.get_argument())
+            if op_code == OpCode.LVAL or op_code == OpCode.RVALINT or op_code == OpCode.RVALBOOL:
+                out += "(FP)"
+        return out
+
+
+def legacy_str(program: Trac42Program) -> str:
+    instructions = program.get_instructions()
+    out = ""
+    for i in range(len(instructions)):
+        out += str(i)+"\t"+legacy_instruction_str(instructions[i])+"\n"
+    return out
+
+
+def generate_linked_program(instructions: int) -> Trac42Program:
+    # a loop body repeated until the program has the requested size, every label closes a block of 10
+    program = Trac42Program()
+    block = 0
+    while len(program) < instructions:
+        label = "L" + str(block)
+        program.emit(Instruction(OpCode.LABEL, target=label))
+        program.emit(Instruction(OpCode.LVAL, argument=-1))
+        program.emit(Instruction(OpCode.RVALINT, argument=-1))
+        program.emit(Instruction(OpCode.PUSHINT, argument=block))
+        program.emit(Instruction(OpCode.ADD))
+        program.emit(Instruction(OpCode.ASSINT))
+        program.emit(Instruction(OpCode.RVALBOOL, argument=2))
+        program.emit(Instruction(OpCode.BRF, target=label))
+        program.emit(Instruction(OpCode.POP, argument=1))
+        program.emit(Instruction(OpCode.BSR, target=label))
+        block += 1
+    program.link()
+    return program
+
+
+def main():
+    sizes = [10000, 100000, 1000000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    for instructions in sizes:
+        program = generate_linked_program(instructions)
+        output = io.StringIO()
+        start = time.perf_counter()
+        program.write(output)
+        elapsed = time.perf_counter() - start
+        legacy = "skipped"
+        if instructions <= LEGACY_MAX_INSTRUCTIONS:
+            start = time.perf_counter()
+            legacy_output = legacy_str(program)
+            legacy = "{0:9.3f} s".format(time.perf_counter() - start)
+            if legacy_output != output.getvalue():
+                raise Exception("Listing differs from the previous __str__ on {0} instructions".format(instructions))
+        print("{0:>8} instructions  streaming writer {1:9.3f} s  previous __str__ {2}"
+              .format(len(program), elapsed, legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Lexing time with the precomputed line start index against the previous find_column, which split the whole
+# source before every token. Run from the Lab2.6 folder with:
+#   python -m Benchmark.ColumnBenchmark [lines ...]
+import re
+import sys
+import time
+
+from Benchmark import generate_program
+from Parser.MyLexer import MyLexer, ColumnIndex
+
+# the previous implementation is only run up to this size, it is quadratic in the source length
+LEGACY_MAX_LINES = 1000
+
+
+def legacy_find_column(string, token):
+    split = re.split(r'\r\n|\r|\n', string[:token.index])
+    string = split[len(split) - 1]
+    string = re.sub(r'\t', '        ', string)
+    return len(string) + 1
+
+
+def lex_columns(string: str, legacy: bool) -> list:
+    columns = []
+    if legacy:
+        for token in MyLexer().tokenize(string):
+            columns.append(legacy_find_column(string, token))
+    else:
+        column_index = ColumnIndex(string)
+        for token in MyLexer().tokenize(string):
+            columns.append(column_index.find_column(token))
+    return columns
+
+
+def main():
+    sizes = [1000, 10000, 100000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    for lines in sizes:
+        string = generate_program(lines)
+        start = time.perf_counter()
+        columns = lex_columns(string, False)
+        elapsed = time.perf_counter() - start
+        legacy = "skipped"
+        if lines <= LEGACY_MAX_LINES:
+            start = time.perf_counter()
+            legacy_columns = lex_columns(string, True)
+            legacy = "{0:9.3f} s".format(time.perf_counter() - start)
+            if legacy_columns != columns:
+                raise Exception("Columns differ from the previous find_column on {0} lines".format(lines))
+        print("{0:>7} lines {1:>8} tokens  line index {2:9.3f} s  previous find_column {3}"
+              .format(lines, len(columns), elapsed, legacy))
+
+
+if __name__ == "__main__":
+    main()
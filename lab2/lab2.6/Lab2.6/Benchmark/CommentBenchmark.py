@@ -0,0 +1,49 @@
+# Comment stripping time of the single regex pass against the previous per line loop, on heavily commented
+# sources. Run from the Lab2.6 folder with:
+#   python -m Benchmark.CommentBenchmark [lines ...]
+import re
+import sys
+import time
+
+from Benchmark import generate_program
+from main import remove_comments
+
+
+def legacy_remove_comments(string: str) -> str:
+    lines = ""
+    string = re.split(r'\r\n|\r|\n', string.strip())
+    for line in string:
+        start = re.search("//", line)
+        if start:
+            lines += line[:start.span()[0]] + "\n"
+        else:
+            lines += line + "\n"
+    return lines
+
+
+def commented_program(lines: int) -> str:
+    # every statement is followed by a comment line and mixed line endings
+    string = generate_program(lines)
+    return string.replace("\n", "\r\n\t// a comment line, with a // nested marker and some text to skip\n")
+
+
+def main():
+    sizes = [10000, 100000, 1000000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    for lines in sizes:
+        string = commented_program(lines)
+        start = time.perf_counter()
+        result = remove_comments(string)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy_result = legacy_remove_comments(string)
+        legacy_elapsed = time.perf_counter() - start
+        if result != legacy_result:
+            raise Exception("Output differs from the previous remove_comments on {0} lines".format(lines))
+        print("{0:>8} lines {1:>10} bytes  single pass {2:7.3f} s  previous loop {3:7.3f} s"
+              .format(lines, len(string), elapsed, legacy_elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Time to fold constant binary expressions with the operator table of the optimizer against the previous folding
+# through eval, run from the Lab2.6 folder with:
+#   python -m Benchmark.ConstantFoldingBenchmark [expressions]
+import random
+import sys
+import time
+
+import AbstractSyntax
+import Optimizer
+from AbstractSyntax.Expression import BINARY_OPERATORS
+from Parser.Type import BinaryOperatorType
+
+INT_OPERATORS = [BinaryOperatorType.PLUS, BinaryOperatorType.MINUS, BinaryOperatorType.MULTIPLY,
+                 BinaryOperatorType.DIVIDE, BinaryOperatorType.MODULUS, BinaryOperatorType.LOWER,
+                 BinaryOperatorType.LOWER_EQ, BinaryOperatorType.GREATER, BinaryOperatorType.GREATER_EQUAL,
+                 BinaryOperatorType.EQUALS, BinaryOperatorType.NOT_EQUALS]
+
+
+def legacy_fold(left: int, bin_op_type: BinaryOperatorType, right: int):
+    return eval(str(left) + str(bin_op_type.value) + str(right))
+
+
+def table_fold(left: int, bin_op_type: BinaryOperatorType, right: int):
+    return BINARY_OPERATORS[bin_op_type](left, right)
+
+
+def random_expressions(expressions: int) -> list:
+    # operands are never 0, a division by 0 is not folded
+    generator = random.Random(42)
+    return [(generator.choice((-1, 1)) * generator.randint(1, 1000), generator.choice(INT_OPERATORS),
+             generator.choice((-1, 1)) * generator.randint(1, 1000)) for unused in range(expressions)]
+
+
+def expression_nodes(expressions: list) -> list:
+    nodes = []
+    for left, bin_op_type, right in expressions:
+        node = AbstractSyntax.BinaryOperatorExpression(-1, -1, bin_op_type,
+                                                       AbstractSyntax.NumberExpression(-1, -1, left),
+                                                       AbstractSyntax.NumberExpression(-1, -1, right))
+        node.typecheck()
+        nodes.append(node)
+    return nodes
+
+
+def benchmark(name: str, fold, expressions: list) -> list:
+    start = time.perf_counter()
+    results = [fold(left, bin_op_type, right) for left, bin_op_type, right in expressions]
+    print("{0:>8} expressions {1:<6} {2:7.3f} s".format(len(expressions), name, time.perf_counter() - start))
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    expressions = random_expressions(count)
+    legacy = benchmark("eval", legacy_fold, expressions)
+    table = benchmark("table", table_fold, expressions)
+    # eval divides as floats and takes the floor of the modulus, the table truncates towards 0 as Trac42 does
+    different = sum(1 for legacy_value, table_value in zip(legacy, table) if legacy_value != table_value)
+    print("{0:>8} expressions folded to a different value".format(different))
+    nodes = expression_nodes(expressions)
+    state = Optimizer.OptimizerState()
+    start = time.perf_counter()
+    folded = [node.optimize(state) for node in nodes]
+    elapsed = time.perf_counter() - start
+    constants = sum(1 for node in folded
+                    if type(node) in (AbstractSyntax.NumberExpression, AbstractSyntax.BooleanExpression))
+    print("{0:>8} expressions optimize {1:7.3f} s, {2} folded to a constant".format(len(nodes), elapsed, constants))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Time to compile and link a program made of a large library of helper functions of which main calls a few, with
+# every function compiled, with the functions main does not reach left out of code generation and with them left out
+# before the typechecker, and the size of the code, run from the Lab2.6 folder with:
+#   python -m Benchmark.DeadFunctionBenchmark [functions [statements]]
+import io
+import sys
+import time
+from contextlib import contextmanager, nullcontext, redirect_stderr
+
+from main import compile_program
+import Optimizer
+import VirtualMachine
+
+
+def library_program(functions: int, statements: int) -> str:
+    # every helper calls the one before it, main calls the first three
+    parts = []
+    for i in range(functions):
+        lines = ["int helper{0}(int x) {{".format(i), "\tint y;", "\ty = x;"]
+        for j in range(statements):
+            lines.append("\ty = y * {0} + {1};".format(j % 3 + 1, i % 10))
+        if i > 0:
+            lines.append("\ty = y + helper{0}(x - 1);".format(i - 1))
+        lines.append("\treturn y;")
+        lines.append("}")
+        parts.append("\n".join(lines))
+    parts.append("void main() {\n\tprint(helper2(4));\n}")
+    return "\n".join(parts) + "\n"
+
+
+def all_reachable(self: "Optimizer.CallGraph", root: str = "main", inlined: set = None) -> set:
+    return set(self.calls.keys())
+
+
+@contextmanager
+def every_function():
+    # the code of every function is generated, as before the call graph
+    reachable = Optimizer.CallGraph.reachable
+    Optimizer.CallGraph.reachable = all_reachable
+    try:
+        yield
+    finally:
+        Optimizer.CallGraph.reachable = reachable
+
+
+def measure(string: str, mode, skip_dead_functions: bool) -> (float, int, int, str):
+    start = time.perf_counter()
+    with mode, redirect_stderr(io.StringIO()):
+        program = compile_program(string, skip_dead_functions=skip_dead_functions)
+    elapsed = time.perf_counter() - start
+    listing = io.StringIO()
+    program.write(listing)
+    output = io.StringIO()
+    VirtualMachine.Trac42VM(program).run(output)
+    return elapsed, len(program), len(listing.getvalue()), output.getvalue()
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    string = library_program(functions, statements)
+    print("{0} functions of {1} statements".format(functions, statements))
+    outputs = set()
+    for name, mode, skip_dead_functions in (("every function", every_function(), False),
+                                            ("reached functions", nullcontext(), False),
+                                            ("--skip-dead-functions", nullcontext(), True)):
+        elapsed, instructions, size, output = measure(string, mode, skip_dead_functions)
+        outputs.add(output)
+        print("{0:<22} compile and link {1:7.3f} s  {2:>8} instructions  {3:>9} bytes of listing"
+              .format(name, elapsed, instructions, size))
+    if len(outputs) != 1:
+        print("the programs printed {0}".format(sorted(outputs)))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
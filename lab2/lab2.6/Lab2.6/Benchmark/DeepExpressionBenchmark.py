@@ -0,0 +1,67 @@
+# Time of the passes over a single expression chaining a large number of operators, left to right and nested in
+# parentheses to the right, under the default recursion limit, run from the Lab2.6 folder with:
+#   python -m Benchmark.DeepExpressionBenchmark [operators]
+import io
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+from main import compile_tree, parse, lex
+import VirtualMachine
+
+
+def left_deep(operators: int) -> str:
+    return "x" + " + x" * operators
+
+
+def right_deep(operators: int) -> str:
+    return "x + (" * operators + "x" + ")" * operators
+
+
+def chain_program(expression: str) -> str:
+    # the operands are a parameter, the optimizer can not fold the chain
+    return "int f(int x) {{\n\treturn {0};\n}}\nvoid main() {{\n\tprint(f(1));\n}}\n".format(expression)
+
+
+def timed(name: str, times: list, function, *args):
+    start = time.perf_counter()
+    with redirect_stderr(io.StringIO()):
+        result = function(*args)
+    times.append("{0} {1:.3f} s".format(name, time.perf_counter() - start))
+    return result
+
+
+def benchmark(name: str, operators: int, expression: str):
+    string = chain_program(expression)
+    times = []
+    tree = timed("parse", times, lambda: parse(lex(string))[0])
+    # the program is compiled without the peephole pass, only the passes over the tree are measured
+    program = timed("compile", times, compile_tree, tree, False)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        timed("run", times, VirtualMachine.Trac42VM(program).run)
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    timed("typecheck", times, tree.typecheck)
+    # the typechecker changes the parameters of the functions, the evaluator runs on a tree that was not typechecked
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    evaluated = io.StringIO()
+    with redirect_stdout(evaluated):
+        timed("evaluate", times, tree.evaluate)
+    print("{0:>8} operators {1:<10} {2}".format(operators, name, "  ".join(times)))
+    for printed in (output.getvalue(), evaluated.getvalue()):
+        if printed.split() != [str(operators + 1)]:
+            print("printed {0!r}, expected {1}".format(printed, operators + 1))
+            sys.exit(1)
+
+
+def main():
+    operators = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print("recursion limit {0}".format(sys.getrecursionlimit()))
+    benchmark("left deep", operators, left_deep(operators))
+    benchmark("right deep", operators, right_deep(operators))
+
+
+if __name__ == "__main__":
+    main()
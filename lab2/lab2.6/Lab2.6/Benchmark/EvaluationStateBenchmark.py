@@ -0,0 +1,75 @@
+# Run time of the tree walking evaluate on deep recursion and on a tight while loop nested in blocks. Run from
+# the Lab2.6 folder with:
+#   python -m Benchmark.EvaluationStateBenchmark [depth] [iterations]
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from main import parse, lex, remove_comments
+
+RECURSION = """
+void main() {{
+    print(sum({0}));
+}}
+
+int sum(int n) {{
+    int result;
+    result = 0;
+    if (n > 0)
+        result = n + sum(n - 1);
+    return result;
+}}
+"""
+
+LOOP = """
+void main() {{
+    int i;
+    int total;
+    i = 0;
+    total = 0;
+    {{
+        {{
+            {{
+                {{
+                    while (i < {0}) {{
+                        int square;
+                        square = i * i;
+                        total = total + square % 7;
+                        i = i + 1;
+                    }}
+                }}
+            }}
+        }}
+    }}
+    print(total);
+}}
+"""
+
+
+def measure(name: str, string: str):
+    abstract_syntax_tree = parse(lex(remove_comments(string)))[0]
+    abstract_syntax_tree.prepass()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        abstract_syntax_tree.evaluate()
+    elapsed = time.perf_counter() - start
+    print("{0:<24} {1:8.3f} s  output {2}".format(name, elapsed, output.getvalue().strip()))
+
+
+def main():
+    depth = 2000
+    iterations = 100000
+    if len(sys.argv) > 1:
+        depth = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        iterations = int(sys.argv[2])
+    # the evaluator uses several python frames for every call
+    sys.setrecursionlimit(100 * depth + 1000)
+    measure("recursion depth {0}".format(depth), RECURSION.format(depth))
+    measure("while {0} iterations".format(iterations), LOOP.format(iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Run time of the closures built by Evaluator.ClosureProgram, lowering included, against the tree walking
+# evaluate, on the recursive fibonacci of the test suite and on a larger one. Run from the Lab2.6 folder with:
+#   python -m Benchmark.EvaluatorBenchmark [n]
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Tuple
+
+from Benchmark import read_program
+from main import parse, lex, remove_comments
+import Evaluator
+
+FIBONACCI = """
+void main() {{
+    print(Fibonacci({0}));
+}}
+
+int Fibonacci(int n) {{
+    if (n < 2)
+        return n;
+    return Fibonacci(n - 1) + Fibonacci(n - 2);
+}}
+"""
+
+
+def evaluate_tree(string: str, repetitions: int) -> Tuple[str, float]:
+    abstract_syntax_tree = parse(lex(string))[0]
+    abstract_syntax_tree.prepass()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        for unused in range(repetitions):
+            abstract_syntax_tree.evaluate()
+    return output.getvalue(), time.perf_counter() - start
+
+
+def evaluate_closures(string: str, repetitions: int) -> Tuple[str, float]:
+    abstract_syntax_tree = parse(lex(string))[0]
+    abstract_syntax_tree.prepass()
+    unused, type_checking_state = abstract_syntax_tree.typecheck()
+    functions = {}
+    for name in type_checking_state.get_all_functions():
+        functions[name] = type_checking_state.lookup_function(name)
+    output = io.StringIO()
+    # lowering is part of the measured time
+    start = time.perf_counter()
+    for unused in range(repetitions):
+        Evaluator.ClosureProgram(functions).run(output)
+    return output.getvalue(), time.perf_counter() - start
+
+
+def measure(name: str, string: str, repetitions: int):
+    tree_output, tree_time = evaluate_tree(string, repetitions)
+    closures_output, closures_time = evaluate_closures(string, repetitions)
+    if tree_output != closures_output:
+        raise Exception("Outputs of {0} differ".format(name))
+    print("{0:<16} {1:>5} runs  evaluate {2:8.3f} s  closures {3:8.3f} s  speedup {4:6.1f}"
+          .format(name, repetitions, tree_time, closures_time, tree_time / closures_time))
+
+
+def main():
+    n = 22
+    if len(sys.argv) > 1:
+        n = int(sys.argv[1])
+    # deep recursion in the tree walking evaluator
+    sys.setrecursionlimit(100000)
+    # the tables are loaded before measuring
+    parse(lex(remove_comments(FIBONACCI.format(1))))
+    measure("008_fib", remove_comments(read_program("008_fib.t42")), 100)
+    measure("fibonacci({0})".format(n), remove_comments(FIBONACCI.format(n)), 1)
+
+
+if __name__ == "__main__":
+    main()
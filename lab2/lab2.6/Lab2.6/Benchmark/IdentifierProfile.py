@@ -0,0 +1,69 @@
+# Profile of the compiler passes that run on the syntax tree (prepass, typecheck, optimize, code generation and
+# the closure evaluator) on the test suites, reporting the share of the run time spent turning nodes into strings
+# through the pretty printer. Run from the Lab2.6 folder with:
+#   python -m Benchmark.IdentifierProfile [repetitions]
+import cProfile
+import io
+import os
+import pstats
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+from Benchmark import TEST_SUITE_24, TEST_SUITE_25, list_programs, read_program
+from main import compile_tree, evaluate_tree, lex, parse, remove_comments
+
+
+def parse_trees(sources: list) -> list:
+    # parsing is not part of the profile
+    trees = list()
+    for string in sources:
+        abstract_syntax_tree = parse(lex(string))[0]
+        if abstract_syntax_tree != "":
+            trees.append(abstract_syntax_tree)
+    return trees
+
+
+def run(compile_trees: list, evaluate_trees: list):
+    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        for abstract_syntax_tree in compile_trees:
+            try:
+                compile_tree(abstract_syntax_tree)
+            except Exception:
+                # typechecking errors and the crashes of the optimizer
+                pass
+        for abstract_syntax_tree in evaluate_trees:
+            try:
+                evaluate_tree(abstract_syntax_tree)
+            except Exception:
+                pass
+
+
+def main():
+    repetitions = 20
+    if len(sys.argv) > 1:
+        repetitions = int(sys.argv[1])
+    sources = [remove_comments(read_program(name, TEST_SUITE_25)) for name in list_programs(TEST_SUITE_25)] + \
+              [remove_comments(read_program(name, TEST_SUITE_24)) for name in list_programs(TEST_SUITE_24)]
+    compile_trees = list()
+    evaluate_trees = list()
+    for unused in range(repetitions):
+        compile_trees += parse_trees(sources)
+        evaluate_trees += parse_trees(sources)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    run(compile_trees, evaluate_trees)
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    total = stats.total_tt
+    pretty = 0
+    for (filename, unused, function), (unused, unused, unused, cumulative, unused) in stats.stats.items():
+        # __str__ of the abstract syntax nodes, which builds a PrettyBuilder every time
+        if function == "__str__" and os.path.basename(os.path.dirname(filename)) == "AbstractSyntax":
+            pretty += cumulative
+    print("{0} programs x {1}: {2:.3f} s profiled, {3:.3f} s ({4:.1f}%) in node __str__"
+          .format(len(sources), repetitions, total, pretty, 100 * pretty / total))
+    stats.sort_stats("tottime").print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Executed instructions and time of the virtual machine with the calls to small functions compiled in place of a BSR
+# against the same programs without inlining, on a loop calling small functions and on the programs of the test suite
+# that call functions, run from the Lab2.6 folder with:
+#   python -m Benchmark.InliningBenchmark [iterations [threshold]]
+import io
+import sys
+import time
+from contextlib import redirect_stderr
+
+from Benchmark import list_programs, read_program
+from main import compile_program, parse, lex, remove_comments
+from Generator import ExpressionProgram, Peephole, Trac42Program
+import AbstractSyntax
+import Optimizer
+import VirtualMachine
+
+
+def call_loop(iterations: int) -> str:
+    # small functions called from other small functions, with early returns and a void function
+    return """int square(int x) {{
+	return x * x;
+}}
+int smaller(int a, int b) {{
+	if (a < b) {{
+		return a;
+	}}
+	return b;
+}}
+int step(int i, int n) {{
+	return smaller(square(i) % 7, n) + 1;
+}}
+void show(int x) {{
+	if (x % 1000 == 0) {{
+		print(x);
+	}}
+}}
+int count(int n) {{
+	int i; int total;
+	i = 0;
+	total = 0;
+	while (i < n) {{
+		total = total + step(i, 3);
+		show(i);
+		i = i + 1;
+	}}
+	return total;
+}}
+void main() {{
+	print(count({0}));
+}}
+""".format(iterations)
+
+
+def compile_unoptimized(string: str, threshold: int) -> Trac42Program:
+    # the optimizer does not run, it would take the variables of the loop as constants
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    unused, state = tree.typecheck()
+    functions = [tree]
+    if type(tree) == AbstractSyntax.SequenceStatement:
+        functions = tree.get_statements()
+    decls_count = dict()
+    for function in functions:
+        decls_count.update(function.get_decl_count())
+    table = {name: state.lookup_function(name) for name in state.get_all_functions()}
+    inlined = Optimizer.Inliner(table, decls_count, threshold).run()
+    program = Peephole().optimize(ExpressionProgram(table, decls_count, inlined).compile(None))
+    program.link()
+    return program
+
+
+def run(program: Trac42Program) -> (int, float, str):
+    output = io.StringIO()
+    start = time.perf_counter()
+    executed = VirtualMachine.Trac42VM(program).run(output)
+    return executed, time.perf_counter() - start, output.getvalue()
+
+
+def compare(compile_string, string: str, threshold: int) -> (tuple, tuple):
+    results = []
+    for limit in (0, threshold):
+        with redirect_stderr(io.StringIO()):
+            program = compile_string(string, limit)
+        results.append(run(program))
+    if results[0][2] != results[1][2]:
+        print("the two programs printed {0!r} and {1!r}".format(results[0][2], results[1][2]))
+        sys.exit(1)
+    return results[0][:2], results[1][:2]
+
+
+def report(name: str, called: tuple, inlined: tuple):
+    print("{0:<28} calls {1:>9} instructions {2:7.3f} s  inlined {3:>9} instructions {4:7.3f} s  {5:5.1f}% fewer"
+          .format(name, called[0], called[1], inlined[0], inlined[1],
+                  100 * (called[0] - inlined[0]) / max(1, called[0])))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    threshold = int(sys.argv[2]) if len(sys.argv) > 2 else Optimizer.INLINE_THRESHOLD
+    report("call loop", *compare(compile_unoptimized, call_loop(iterations), threshold))
+    called = [0, 0.0]
+    inlined = [0, 0.0]
+    for name in list_programs():
+        string = read_program(name)
+        try:
+            program_called, program_inlined = compare(
+                lambda program_string, limit: compile_program(remove_comments(program_string), inline_threshold=limit),
+                string, threshold)
+        except Exception:
+            continue
+        if program_called[0] == program_inlined[0]:
+            continue
+        report(name, program_called, program_inlined)
+        for total, result in ((called, program_called), (inlined, program_inlined)):
+            total[0] += result[0]
+            total[1] += result[1]
+    report("test suite, changed programs", called, inlined)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Memory per instruction and time to emit and link a large program, with the array backed Trac42Program against
+# the previous list of Instruction objects. Run from the Lab2.6 folder with:
+#   python -m Benchmark.InstructionStreamBenchmark [instructions ...]
+import sys
+import time
+import tracemalloc
+
+from Generator import Instruction, OpCode, Trac42Program
+
+
+class LegacyProgram:
+    def __init__(self):
+        self.__program = list()
+
+    def link(self):
+        link_map = {}
+        for i in range(len(self.__program)):
+            if self.__program[i].get_op_code() == OpCode.LABEL:
+                link_map[self.__program[i].target] = i
+
+        for instruction in self.__program:
+            if instruction.get_op_code() == OpCode.BSR or instruction.get_op_code() == OpCode.BRF or \
+                    instruction.get_op_code() == OpCode.BRA:
+                instruction.target = link_map[instruction.target]
+
+    def emit(self, instruction: Instruction):
+        self.__program.append(instruction)
+
+
+def emit_program(program, instructions: int):
+    # the same blocks of 10 instructions as a compiled loop, every block has its own label
+    for block in range(instructions // 10):
+        label = "L" + str(block)
+        program.emit(Instruction(OpCode.LABEL, target=label))
+        program.emit(Instruction(OpCode.LVAL, argument=-1))
+        program.emit(Instruction(OpCode.RVALINT, argument=-1))
+        program.emit(Instruction(OpCode.PUSHINT, argument=block))
+        program.emit(Instruction(OpCode.ADD))
+        program.emit(Instruction(OpCode.ASSINT))
+        program.emit(Instruction(OpCode.PUSHBOOL, argument="true"))
+        program.emit(Instruction(OpCode.BRF, target=label))
+        program.emit(Instruction(OpCode.POP, argument=1))
+        program.emit(Instruction(OpCode.BSR, target=label))
+
+
+def benchmark(name: str, program_class: type, instructions: int):
+    program = program_class()
+    start = time.perf_counter()
+    emit_program(program, instructions)
+    emitted = time.perf_counter() - start
+    start = time.perf_counter()
+    program.link()
+    linked = time.perf_counter() - start
+    del program
+    # memory is measured on a second program, tracing the allocations slows down the emission
+    tracemalloc.start()
+    program = program_class()
+    emit_program(program, instructions)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("{0:>8} instructions {1:<9} emit {2:7.3f} s  link {3:7.3f} s  {4:7.1f} bytes/instruction"
+          .format(instructions, name, emitted, linked, memory / instructions))
+
+
+def main():
+    sizes = [100000, 1000000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    for instructions in sizes:
+        benchmark("objects", LegacyProgram, instructions)
+        benchmark("arrays", Trac42Program, instructions)
+
+
+if __name__ == "__main__":
+    main()
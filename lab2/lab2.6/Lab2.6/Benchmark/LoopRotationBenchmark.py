@@ -0,0 +1,73 @@
+# Executed instructions of the programs of the test suite with while loops, with the guard tested after the body
+# against the guard tested before it, run from the Lab2.6 folder with:
+#   python -m Benchmark.LoopRotationBenchmark
+import io
+from contextlib import contextmanager, nullcontext, redirect_stderr
+
+from Benchmark import list_programs, read_program
+from main import compile_program, remove_comments
+import AbstractSyntax
+import Generator
+import VirtualMachine
+
+
+def top_tested_compile(self: "AbstractSyntax.WhileStatement", state: "Generator.GeneratorState",
+                       program: "Generator.Trac42Program"):
+    # the layout before loops were rotated, every iteration tests the guard and branches back to it
+    state.is_return_last_function = False
+    label_while = state.rename_label("while_do")
+    label_end = state.rename_label("end_while")
+    program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_while))
+    self.get_expression().compile_branch(state, program, label_end, False)
+    self.get_body().compile(state, program)
+    if not state.is_return_last_function:
+        program.emit(Generator.Instruction(Generator.OpCode.BRA, target=label_while))
+    program.emit(Generator.Instruction(Generator.OpCode.LABEL, target=label_end))
+
+
+@contextmanager
+def top_tested_loops():
+    rotated_compile = AbstractSyntax.WhileStatement.compile
+    AbstractSyntax.WhileStatement.compile = top_tested_compile
+    try:
+        yield
+    finally:
+        AbstractSyntax.WhileStatement.compile = rotated_compile
+
+
+def run(string: str) -> (int, str):
+    with redirect_stderr(io.StringIO()):
+        program = compile_program(remove_comments(string))
+    output = io.StringIO()
+    return VirtualMachine.Trac42VM(program).run(output), output.getvalue()
+
+
+def main():
+    top_total = 0
+    rotated_total = 0
+    for name in list_programs():
+        string = read_program(name)
+        if "while" not in string:
+            continue
+        results = []
+        try:
+            for layout in (top_tested_loops(), nullcontext()):
+                with layout:
+                    results.append(run(string))
+        except Exception as e:
+            print("{0:<28} skipped, does not compile: {1}".format(name, repr(e)))
+            continue
+        (top_executed, top_output), (rotated_executed, rotated_output) = results
+        if top_output != rotated_output:
+            print("{0}: the two programs printed {1!r} and {2!r}".format(name, top_output, rotated_output))
+            return
+        top_total += top_executed
+        rotated_total += rotated_executed
+        print("{0:<28} guard before body {1:>8} instructions  guard after body {2:>8} instructions  {3:5.1f}% fewer"
+              .format(name, top_executed, rotated_executed, 100 * (top_executed - rotated_executed) / top_executed))
+    print("{0:<28} guard before body {1:>8} instructions  guard after body {2:>8} instructions  {3:5.1f}% fewer"
+          .format("total", top_total, rotated_total, 100 * (top_total - rotated_total) / max(1, top_total)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Code size, compile time and executed instructions of nested % expressions whose operands call a function, run
+# from the Lab2.6 folder with:
+#   python -m Benchmark.ModulusBenchmark [depth ...]
+import io
+import sys
+import time
+from contextlib import redirect_stderr
+
+from main import compile_program
+from Generator import OpCode
+from VirtualMachine import Trac42VM
+
+
+def nested_modulus(depth: int, left: bool) -> str:
+    # (((f(n) % f(n)) % f(n - 1)) ... when nested on the left, f(1001) % (f(2001) % (... + 1) + 1) on the right
+    expression = "f({0})".format(depth + 1)
+    for i in range(depth, 0, -1):
+        if left:
+            expression = "({0} % f({1}))".format(expression, i + 1)
+        else:
+            expression = "(f({0}) % ({1} + 1))".format(i * 1000 + 1, expression)
+    return "int f(int x) {\n\treturn x + 2;\n}\nvoid main() {\n\tprint(" + expression + ");\n}\n"
+
+
+def main():
+    depths = [4, 8, 12, 16]
+    if len(sys.argv) > 1:
+        depths = [int(arg) for arg in sys.argv[1:]]
+    for left in (True, False):
+        for depth in depths:
+            string = nested_modulus(depth, left)
+            start = time.perf_counter()
+            with redirect_stderr(io.StringIO()):
+                program = compile_program(string)
+            elapsed = time.perf_counter() - start
+            static = sum(1 for instruction in program.get_instructions() if instruction.get_op_code() != OpCode.LABEL)
+            output = io.StringIO()
+            executed = Trac42VM(program).run(output)
+            print("{0:<5} depth {1:>3}  compile {2:8.3f} s  {3:>8} instructions  {4:>9} executed  result {5}"
+                  .format("left" if left else "right", depth, elapsed, static, executed, output.getvalue().strip()))
+
+
+if __name__ == "__main__":
+    main()
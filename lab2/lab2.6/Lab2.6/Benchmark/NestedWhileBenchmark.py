@@ -0,0 +1,67 @@
+# Time and peak memory of the optimizer on while loops nested in each other, each with a large guard, run from the
+# Lab2.6 folder with:
+#   python -m Benchmark.NestedWhileBenchmark [loops [guard terms]]
+import io
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stderr
+
+from main import parse, lex
+import AbstractSyntax
+import Optimizer
+
+
+def nested_while(loops: int, terms: int) -> str:
+    # every loop counts its own variable down from the parameter, so that no guard can be folded, the guard also
+    # reads the variables of the outer loops
+    lines = ["void run(int n) {"]
+    for i in range(loops):
+        lines.append("\tint v{0};".format(i))
+    for i in range(loops):
+        guard = " + ".join("v{0} * {1}".format((i + j) % (i + 1), j + 1) for j in range(terms))
+        lines.append("\t" * (i + 1) + "v{0} = n;".format(i))
+        lines.append("\t" * (i + 1) + "while (v{0} > 0 && {1} > 0) {{".format(i, guard))
+    lines.append("\t" * (loops + 1) + "print(v{0});".format(loops - 1))
+    for i in range(loops - 1, -1, -1):
+        lines.append("\t" * (i + 2) + "v{0} = v{0} - 1;".format(i))
+        lines.append("\t" * (i + 1) + "}")
+    lines.append("}")
+    lines.append("void main() {")
+    lines.append("\trun(1);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def prepared_functions(string: str) -> list:
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    tree.typecheck()
+    if type(tree) == AbstractSyntax.SequenceStatement:
+        return tree.get_statements()
+    return [tree]
+
+
+def main():
+    # the passes over the tree recurse along the nested loops
+    sys.setrecursionlimit(1000000)
+    loops = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    terms = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    string = nested_while(loops, terms)
+    optimizer = Optimizer.ProgramOptimizer(prepared_functions(string))
+    start = time.perf_counter()
+    with redirect_stderr(io.StringIO()):
+        optimizer.run()
+    elapsed = time.perf_counter() - start
+    # memory is measured on a second tree, tracing the allocations slows down the optimizer
+    traced_optimizer = Optimizer.ProgramOptimizer(prepared_functions(string))
+    tracemalloc.start()
+    with redirect_stderr(io.StringIO()):
+        traced_optimizer.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("{0} nested loops, {1} terms per guard: {2} passes, {3} node visits, {4:.3f} s, peak {5:.1f} MiB"
+          .format(loops, terms, len(optimizer.passes), optimizer.get_node_visits(), elapsed, peak / (1 << 20)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Memory per node of the abstract syntax tree and time of every pass of the pipeline on a large program, run from the
+# Lab2.6 folder with:
+#   python -m Benchmark.NodeMemoryBenchmark [statements]
+import gc
+import io
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stderr
+
+from main import compile_tree, parse, lex
+import AbstractSyntax
+
+# statements in the body of every function
+FUNCTION_STATEMENTS = 100
+
+
+def generate_program(statements: int) -> str:
+    # every function reads its parameters, so that the optimizer can not fold its statements
+    lines = []
+    functions = max(1, statements // FUNCTION_STATEMENTS)
+    for i in range(functions):
+        lines.append("int f{0}(int x, int y) {{".format(i))
+        lines.append("\tint z;")
+        lines.append("\tz = x;")
+        for j in range((FUNCTION_STATEMENTS - 4) // 4):
+            lines.append("\tz = z * {0} + y % {1};".format(j + 2, j + 3))
+            lines.append("\tif (z > x && !(y == {0})) {{ y = y - 1; }}".format(j))
+            lines.append("\twhile (y > z) {{ y = y - {0}; }}".format(j + 1))
+            lines.append("\tprint(z, -y);")
+        lines.append("\treturn z;")
+        lines.append("}")
+    lines.append("void main() {")
+    lines.append("\tprint(f0(1, 2));")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def count_nodes() -> int:
+    return sum(1 for value in gc.get_objects() if isinstance(value, (AbstractSyntax.Expression,
+                                                                     AbstractSyntax.Statement)))
+
+
+def main():
+    # sequences of statements are nested in each other
+    sys.setrecursionlimit(1000000)
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    string = generate_program(statements)
+    # memory is measured on a first tree, tracing the allocations slows down the parser
+    tracemalloc.start()
+    tree = parse(lex(string))[0]
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    nodes = count_nodes()
+    del tree
+    gc.collect()
+    times = []
+    start = time.perf_counter()
+    tree = parse(lex(string))[0]
+    times.append(("parse", time.perf_counter() - start))
+    start = time.perf_counter()
+    str(tree)
+    times.append(("pretty", time.perf_counter() - start))
+    start = time.perf_counter()
+    with redirect_stderr(io.StringIO()):
+        compile_tree(tree, False)
+    times.append(("compile", time.perf_counter() - start))
+    print("{0} statements, {1} nodes, {2:.1f} bytes per node".format(statements, nodes, memory / nodes))
+    print("  ".join("{0} {1:.3f} s".format(name, elapsed) for name, elapsed in times) +
+          "  total {0:.3f} s".format(sum(elapsed for unused, elapsed in times)))
+
+
+if __name__ == "__main__":
+    main()
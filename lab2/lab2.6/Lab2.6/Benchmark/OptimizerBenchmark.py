@@ -0,0 +1,82 @@
+# Node visits and time to reach the optimizer fixpoint, passing over the whole program until no function has
+# constants left against the worklist of functions, run from the Lab2.6 folder with:
+#   python -m Benchmark.OptimizerBenchmark [functions ...]
+import io
+import sys
+import time
+from contextlib import redirect_stderr
+
+from main import parse, lex
+import AbstractSyntax
+import Optimizer
+
+
+def generate_functions(functions: int) -> str:
+    # only the last function has a variable that is never assigned, it needs a second pass to be removed, names
+    # are different in every function because the whole program passes share them between functions
+    lines = []
+    for i in range(functions):
+        lines.append("int f{0}(int x{0}) {{".format(i))
+        lines.append("\tint y{0};".format(i))
+        lines.append("\tint z{0};".format(i))
+        lines.append("\ty{0} = x{0} * 2 + {0};".format(i))
+        lines.append("\twhile (y{0} > 10) {{".format(i))
+        lines.append("\t\ty{0} = y{0} - 3;".format(i))
+        lines.append("\t}")
+        if i < functions - 1:
+            lines.append("\tz{0} = y{0} % 7;".format(i))
+        lines.append("\treturn y{0} + z{0};".format(i))
+        lines.append("}")
+    lines.append("void main() {")
+    lines.append("\tprint(f0(5));")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def prepared_tree(string: str) -> "AbstractSyntax.Statement":
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    tree.typecheck()
+    return tree
+
+
+def whole_program(tree: "AbstractSyntax.Statement") -> list:
+    # the previous loop of compile_tree
+    state = Optimizer.OptimizerState()
+    passes = []
+    while True:
+        state.new_scope()
+        tree.optimize(state)
+        passes.append(state.node_visits)
+        state.assign_constants_to_delete()
+        if not state.start_again:
+            break
+    return passes
+
+
+def worklist(tree: "AbstractSyntax.Statement") -> list:
+    optimizer = Optimizer.ProgramOptimizer(tree.get_statements())
+    optimizer.run()
+    return [visits for unused, visits in optimizer.passes]
+
+
+def main():
+    # the passes over the program recurse along the chain of functions
+    sys.setrecursionlimit(100000)
+    sizes = [100, 1000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    for functions in sizes:
+        string = generate_functions(functions)
+        for name, optimize in (("whole program", whole_program), ("worklist", worklist)):
+            tree = prepared_tree(string)
+            start = time.perf_counter()
+            with redirect_stderr(io.StringIO()):
+                passes = optimize(tree)
+            elapsed = time.perf_counter() - start
+            print("{0:>5} functions {1:<14} {2:>5} passes {3:>8} node visits {4:8.3f} s"
+                  .format(functions, name, len(passes), sum(passes), elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Wall clock time of the batch driver with 1, 2, 4 and 8 worker processes, on the test suites and on a
+# generated corpus. Run from the Lab2.6 folder with:
+#   python -m Benchmark.ParallelBenchmark [files] [statements]
+import os
+import sys
+import tempfile
+import time
+
+from Benchmark import TEST_SUITE_24, TEST_SUITE_25, generate_program, list_programs
+from batch import compile_files
+
+WORKERS = [1, 2, 4, 8]
+
+
+def measure(name: str, paths: list):
+    expected = None
+    single = None
+    for workers in WORKERS:
+        start = time.perf_counter()
+        results = list(compile_files(paths, workers))
+        elapsed = time.perf_counter() - start
+        # the order of the results must not depend on the number of workers
+        statuses = [status for status, stdout, stderr in results]
+        if expected is None:
+            expected = statuses
+            single = elapsed
+        elif statuses != expected:
+            raise Exception("Results differ with {0} workers".format(workers))
+        print("{0:<16} {1:>4} files  {2} workers {3:8.3f} s  speedup {4:5.2f}"
+              .format(name, len(paths), workers, elapsed, single / elapsed))
+
+
+def main():
+    files = 64
+    statements = 500
+    if len(sys.argv) > 1:
+        files = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        statements = int(sys.argv[2])
+    print("{0} cores".format(os.cpu_count()))
+    suites = [os.path.join(TEST_SUITE_25, name) for name in list_programs(TEST_SUITE_25)] + \
+             [os.path.join(TEST_SUITE_24, name) for name in list_programs(TEST_SUITE_24)]
+    measure("test suites", suites)
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for i in range(files):
+            path = os.path.join(folder, "{0:03}_generated.t42".format(i))
+            with open(path, "w") as f:
+                f.write(generate_program(statements + i))
+            paths.append(path)
+        measure("generated", paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Import time of Parser.MyParser without (cold) and with (warm) the cached LALR tables, run from the Lab2.6
+# folder with:
+#   python -m Benchmark.ParserStartupBenchmark [repetitions]
+import os
+import subprocess
+import sys
+import time
+
+from Parser.MyParser import MyParser
+
+LAB_FOLDER = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def import_time(remove_tables: bool) -> float:
+    if remove_tables and os.path.exists(MyParser.tablefile):
+        os.remove(MyParser.tablefile)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import Parser.MyParser"], cwd=LAB_FOLDER, check=True,
+                   stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    repetitions = 10
+    if len(sys.argv) > 1:
+        repetitions = int(sys.argv[1])
+    # python startup alone, to separate it from the parser construction
+    start = time.perf_counter()
+    for unused in range(repetitions):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = (time.perf_counter() - start) / repetitions
+    cold = sum(import_time(True) for unused in range(repetitions)) / repetitions
+    warm = sum(import_time(False) for unused in range(repetitions)) / repetitions
+    print("interpreter startup {0:8.1f} ms".format(interpreter * 1000))
+    print("cold import         {0:8.1f} ms".format(cold * 1000))
+    print("warm import         {0:8.1f} ms".format(warm * 1000))
+    print("speedup             {0:8.2f} x ({1:.2f} x without interpreter startup)"
+          .format(cold / warm, (cold - interpreter) / (warm - interpreter)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Static and dynamic instruction counts of the test suite with and without the peephole pass, run from the Lab2.6
+# folder with:
+#   python -m Benchmark.PeepholeBenchmark [--all]
+import io
+import sys
+from contextlib import redirect_stderr
+
+from Benchmark import read_program, list_programs, TEST_SUITE_25, TEST_SUITE_24
+from main import compile_tree, parse, lex, remove_comments
+from Generator import OpCode
+from VirtualMachine import Trac42VM
+
+
+def counts(string: str, peephole: bool):
+    # instructions in the listing without labels and instructions executed by the virtual machine
+    program = compile_tree(parse(lex(remove_comments(string)))[0], peephole)
+    static = sum(1 for instruction in program.get_instructions() if instruction.get_op_code() != OpCode.LABEL)
+    return static, Trac42VM(program).run(io.StringIO())
+
+
+def main():
+    directories = [TEST_SUITE_25]
+    if "--all" in sys.argv[1:]:
+        directories.append(TEST_SUITE_24)
+    totals = [0, 0, 0, 0]
+    for directory in directories:
+        for name in list_programs(directory):
+            string = read_program(name, directory)
+            try:
+                with redirect_stderr(io.StringIO()):
+                    before = counts(string, False)
+                    after = counts(string, True)
+            except Exception as e:
+                print("{0:<32} skipped, does not compile: {1}".format(name, repr(e)))
+                continue
+            for i, count in enumerate(before + after):
+                totals[i] += count
+            print("{0:<32} static {1:>5} -> {2:>5}  dynamic {3:>9} -> {4:>9}"
+                  .format(name, before[0], after[0], before[1], after[1]))
+    print("{0:<32} static {1:>5} -> {2:>5} ({3:.1%} saved)  dynamic {4:>9} -> {5:>9} ({6:.1%} saved)"
+          .format("total", totals[0], totals[2], 1 - totals[2] / totals[0],
+                  totals[1], totals[3], 1 - totals[3] / totals[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Compiles, runs and evaluates a program whose functions have a very large number of statements, under the default
+# recursion limit, and checks that both the compiled program and the evaluator print the expected value. Run from
+# the Lab2.6 folder with:
+#   python -m Benchmark.SequenceStress [statements [functions]]
+import io
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+from main import compile_tree, evaluate_tree, parse, lex
+import VirtualMachine
+
+
+def long_function(name: str, statements: int) -> (str, int):
+    # the function adds 1 + 2 + ... to its parameter one statement at a time, the result of f(0) is returned too
+    lines = ["int {0}(int x) {{".format(name), "\tint y;", "\ty = x;"]
+    total = 0
+    for i in range(statements):
+        lines.append("\ty = y + {0};".format(i % 10))
+        total += i % 10
+    lines.append("\treturn y;")
+    lines.append("}")
+    return "\n".join(lines), total
+
+
+def stress_program(statements: int, functions: int) -> (str, int):
+    parts = []
+    total = 0
+    for i in range(functions):
+        part, result = long_function("f{0}".format(i), statements)
+        parts.append(part)
+        total += result
+    calls = " + ".join("f{0}(0)".format(i) for i in range(functions))
+    parts.append("void main() {{\n\tprint({0});\n}}".format(calls))
+    return "\n".join(parts) + "\n", total
+
+
+def timed(name: str, times: list, function, *args):
+    start = time.perf_counter()
+    with redirect_stderr(io.StringIO()):
+        result = function(*args)
+    times.append("{0} {1:.3f} s".format(name, time.perf_counter() - start))
+    return result
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    functions = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    string, total = stress_program(statements, functions)
+    times = []
+    tree = timed("parse", times, lambda: parse(lex(string))[0])
+    timed("pretty", times, str, tree)
+    program = timed("compile", times, compile_tree, tree)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        timed("run", times, VirtualMachine.Trac42VM(program).run)
+    evaluated = io.StringIO()
+    with redirect_stdout(evaluated):
+        timed("evaluate", times, evaluate_tree, parse(lex(string))[0])
+    print("{0} functions of {1} statements, recursion limit {2}: {3}".format(functions, statements,
+                                                                            sys.getrecursionlimit(), "  ".join(times)))
+    for name, printed in (("run", output.getvalue()), ("evaluate", evaluated.getvalue())):
+        if printed.split() != [str(total)]:
+            print("{0} printed {1!r}, expected {2}".format(name, printed, total))
+            sys.exit(1)
+    print("run and evaluate printed {0}".format(total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Executed instructions and time of the virtual machine with guards compiled as branches against guards that compute
+# their value and test it, on a loop with guards made of &&, || and ! and on the programs of the test suite, run from
+# the Lab2.6 folder with:
+#   python -m Benchmark.ShortCircuitBenchmark [iterations]
+import io
+import sys
+import time
+from contextlib import contextmanager, nullcontext, redirect_stderr
+
+from Benchmark import list_programs, read_program
+from main import compile_program, parse, lex, remove_comments
+from Generator import ExpressionProgram, Peephole, Trac42Program
+import AbstractSyntax
+import VirtualMachine
+
+# classes with a form of their guards made of branches
+BRANCHING_EXPRESSIONS = [AbstractSyntax.BooleanExpression, AbstractSyntax.BinaryOperatorExpression,
+                         AbstractSyntax.UnaryOperatorExpression, AbstractSyntax.BlockExpression]
+
+
+def guard_loop(iterations: int) -> str:
+    # the operands of the guards are calls and parameters, the right operand of a && or || is skipped only when it
+    # has no side effect
+    return """int previous(int x) {{
+	return x - 1;
+}}
+bool odd(int x) {{
+	return x % 2 == 1;
+}}
+int count(int n, int m) {{
+	int i; int hits;
+	i = n;
+	hits = m;
+	while (i > 0 && !(i == m - 1)) {{
+		if (i % 3 == 0 || i % 5 == 0 && !(i % 7 == 0)) {{
+			hits = hits + 1;
+		}}
+		if (!(i < 10 || i > n - 10) && (i != 77 || hits > 2)) {{
+			hits = hits + 2;
+		}}
+		if (odd(i) && (i > m || hits < m)) {{
+			hits = hits - 1;
+		}}
+		i = previous(i);
+	}}
+	return hits;
+}}
+void main() {{
+	print(count({0}, 0));
+}}
+""".format(iterations)
+
+
+@contextmanager
+def value_guards():
+    # every guard computes its value before the branch, as before guards were compiled as branches
+    saved = [(expression_class, expression_class.__dict__["compile_branch"]) for expression_class in
+             BRANCHING_EXPRESSIONS]
+    for expression_class in BRANCHING_EXPRESSIONS:
+        expression_class.compile_branch = AbstractSyntax.Expression.compile_branch
+    try:
+        yield
+    finally:
+        for expression_class, compile_branch in saved:
+            expression_class.compile_branch = compile_branch
+
+
+def compile_unoptimized(string: str) -> Trac42Program:
+    # the optimizer does not run, the guards of the loop are compiled as they are written
+    tree = parse(lex(string))[0]
+    tree.prepass()
+    unused, state = tree.typecheck()
+    functions = [tree]
+    if type(tree) == AbstractSyntax.SequenceStatement:
+        functions = tree.get_statements()
+    decls_count = dict()
+    for function in functions:
+        decls_count.update(function.get_decl_count())
+    table = {name: state.lookup_function(name) for name in state.get_all_functions()}
+    program = Peephole().optimize(ExpressionProgram(table, decls_count).compile(None))
+    program.link()
+    return program
+
+
+def run(program: Trac42Program) -> (int, float, str):
+    output = io.StringIO()
+    start = time.perf_counter()
+    executed = VirtualMachine.Trac42VM(program).run(output)
+    return executed, time.perf_counter() - start, output.getvalue()
+
+
+def compare(compile_string, string: str) -> (tuple, tuple):
+    results = []
+    for guards in (value_guards(), nullcontext()):
+        with guards, redirect_stderr(io.StringIO()):
+            program = compile_string(string)
+        results.append(run(program))
+    if results[0][2] != results[1][2]:
+        print("the two programs printed {0!r} and {1!r}".format(results[0][2], results[1][2]))
+        sys.exit(1)
+    return results[0][:2], results[1][:2]
+
+
+def report(name: str, value: tuple, branch: tuple):
+    print("{0:<28} value {1:>9} instructions {2:7.3f} s  branch {3:>9} instructions {4:7.3f} s  {5:5.1f}% fewer"
+          .format(name, value[0], value[1], branch[0], branch[1], 100 * (value[0] - branch[0]) / max(1, value[0])))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    report("guard loop", *compare(compile_unoptimized, guard_loop(iterations)))
+    value = [0, 0.0]
+    branch = [0, 0.0]
+    compiled = 0
+    programs = list_programs()
+    for name in programs:
+        try:
+            program_value, program_branch = compare(lambda string: compile_program(remove_comments(string)),
+                                                    read_program(name))
+        except Exception:
+            continue
+        compiled += 1
+        for total, result in ((value, program_value), (branch, program_branch)):
+            total[0] += result[0]
+            total[1] += result[1]
+    report("test suite, {0} of {1}".format(compiled, len(programs)), value, branch)
+
+
+if __name__ == "__main__":
+    main()
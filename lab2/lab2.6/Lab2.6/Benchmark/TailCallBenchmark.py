@@ -0,0 +1,104 @@
+# Executed instructions, time and memory of the virtual machine with the returns of a call to the function itself
+# compiled as a jump to its start against the same returns compiled as calls, on functions recursing to a large depth,
+# run from the Lab2.6 folder with:
+#   python -m Benchmark.TailCallBenchmark [depth]
+import io
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext, redirect_stderr
+
+from main import compile_program
+import AbstractSyntax
+import Generator
+import TypeChecker
+import VirtualMachine
+
+
+def recursive_program(depth: int) -> str:
+    # every function returns a call to itself, the loops of the optimizer are not involved
+    return """int sum(int n, int total) {{
+	if (n == 0) {{
+		return total;
+	}}
+	return sum(n - 1, total + n);
+}}
+int collatz(int n, int steps) {{
+	if (n == 1) {{
+		return steps;
+	}}
+	if (n % 2 == 0) {{
+		return collatz(n / 2, steps + 1);
+	}}
+	return collatz(3 * n + 1, steps + 1);
+}}
+int digits(int n, int b, int count) {{
+	if (n < b) {{
+		return count + 1;
+	}}
+	return digits(n / b, b, count + 1);
+}}
+void main() {{
+	print(sum({0}, 0));
+	print(collatz(837799, 0));
+	print(digits({0}, 2, 0));
+}}
+""".format(depth)
+
+
+def called_tail_call(self: "AbstractSyntax.FunctionCallExpression", state: "Generator.GeneratorState",
+                     program: "Generator.Trac42Program"):
+    # the return as it was compiled before tail calls, the value of the call is stored and the frame is left
+    program.emit(Generator.Instruction(Generator.OpCode.LVAL, state.lookup("return")))
+    self.compile(state, program)
+    if state.get_ret_type(self.get_name()) == TypeChecker.Types.BOOL:
+        program.emit(Generator.Instruction(Generator.OpCode.ASSBOOL))
+    else:
+        program.emit(Generator.Instruction(Generator.OpCode.ASSINT))
+    program.emit(Generator.Instruction(Generator.OpCode.UNLINK))
+    program.emit(Generator.Instruction(Generator.OpCode.RTS))
+    state.is_return_last_function = True
+
+
+@contextmanager
+def tail_calls_as_calls():
+    compile_tail_call = AbstractSyntax.FunctionCallExpression.compile_tail_call
+    AbstractSyntax.FunctionCallExpression.compile_tail_call = called_tail_call
+    try:
+        yield
+    finally:
+        AbstractSyntax.FunctionCallExpression.compile_tail_call = compile_tail_call
+
+
+def run(program: "Generator.Trac42Program") -> (int, float, int, str):
+    output = io.StringIO()
+    tracemalloc.start()
+    start = time.perf_counter()
+    executed = VirtualMachine.Trac42VM(program).run(output)
+    elapsed = time.perf_counter() - start
+    unused, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return executed, elapsed, peak, output.getvalue()
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    string = recursive_program(depth)
+    results = []
+    for layout in (tail_calls_as_calls(), nullcontext()):
+        with layout, redirect_stderr(io.StringIO()):
+            program = compile_program(string)
+        results.append(run(program))
+    (called_executed, called_time, called_peak, called_output), (jump_executed, jump_time, jump_peak, jump_output) = \
+        results
+    if called_output != jump_output:
+        print("the two programs printed {0!r} and {1!r}".format(called_output, jump_output))
+        sys.exit(1)
+    print("depth {0}, printed {1}".format(depth, " ".join(jump_output.split())))
+    print("calls {0:>10} instructions {1:7.3f} s {2:>10} bytes".format(called_executed, called_time, called_peak))
+    print("jumps {0:>10} instructions {1:7.3f} s {2:>10} bytes  {3:5.1f}% fewer instructions".format(
+        jump_executed, jump_time, jump_peak, 100 * (called_executed - jump_executed) / max(1, called_executed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Peak memory of lexing and parsing with the whole token list built before parsing, as main.py used to do,
+# against the tokens streamed from the lexer into the parser. Run from the Lab2.6 folder with:
+#   python -m Benchmark.TokenStreamBenchmark [lines ...]
+import sys
+import time
+import tracemalloc
+
+from Benchmark import generate_program
+from main import remove_comments
+from Parser.MyLexer import MyLexer, ColumnIndex
+from Parser.MyParser import MyParser
+
+
+def lex_list(string: str) -> list:
+    column_index = ColumnIndex(string)
+    token_list = []
+    for token in MyLexer().tokenize(string):
+        token.index = column_index.find_column(token)
+        token_list.append(token)
+    return token_list
+
+
+def lex_stream(string: str):
+    column_index = ColumnIndex(string)
+    for token in MyLexer().tokenize(string):
+        token.index = column_index.find_column(token)
+        yield token
+
+
+def measure(string: str, stream: bool) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    if stream:
+        tree = MyParser().parse(lex_stream(string))
+    else:
+        tree = MyParser().parse(iter(lex_list(string)))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del tree
+    return elapsed, peak
+
+
+def main():
+    sizes = [1000, 10000, 100000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+    # build the parser tables before measuring
+    MyParser().parse(lex_stream(remove_comments(generate_program(1))))
+    for lines in sizes:
+        string = remove_comments(generate_program(lines))
+        list_time, list_peak = measure(string, False)
+        stream_time, stream_peak = measure(string, True)
+        print("{0:>7} lines  token list {1:8.1f} MiB {2:7.3f} s  stream {3:8.1f} MiB {4:7.3f} s"
+              .format(lines, list_peak / (1 << 20), list_time, stream_peak / (1 << 20), stream_time))
+
+
+if __name__ == "__main__":
+    main()
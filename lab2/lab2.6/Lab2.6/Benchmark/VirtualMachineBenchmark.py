@@ -0,0 +1,43 @@
+# Trac42 virtual machine throughput, run from the Lab2.6 folder with:
+#   python -m Benchmark.VirtualMachineBenchmark [--all] [repetitions]
+import io
+import sys
+import time
+
+from Benchmark import read_program, list_programs
+from main import compile_program, remove_comments
+from VirtualMachine import Trac42VM
+
+PROGRAMS = ["008_fib.t42", "015_recursive_functions.t42"]
+
+
+def benchmark(name: str, repetitions: int) -> None:
+    try:
+        program = compile_program(remove_comments(read_program(name)))
+    except Exception as e:
+        print("{0:<32} skipped, does not compile: {1}".format(name, repr(e)))
+        return
+    vm = Trac42VM(program)
+    executed = 0
+    start = time.perf_counter()
+    for unused in range(repetitions):
+        executed += vm.run(io.StringIO())
+    elapsed = time.perf_counter() - start
+    print("{0:<32} {1:>12} instructions {2:>9.3f} s {3:>14,.0f} instructions/s"
+          .format(name, executed, elapsed, executed / elapsed))
+
+
+def main():
+    repetitions = 2000
+    programs = PROGRAMS
+    for arg in sys.argv[1:]:
+        if arg == "--all":
+            programs = list_programs()
+        else:
+            repetitions = int(arg)
+    for name in programs:
+        benchmark(name, repetitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+from typing import List
+
+TEST_SUITE_25 = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "lab2.5", "test_suite_25"))
+TEST_SUITE_24 = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "lab2.4", "test_suite_24_new"))
+
+
+def read_program(name: str, directory: str = TEST_SUITE_25) -> str:
+    with open(os.path.join(directory, name), "r") as f:
+        return f.read()
+
+
+def list_programs(directory: str = TEST_SUITE_25) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.endswith(".t42"))
+
+
+def generate_program(statements: int) -> str:
+    # straight line main function with one assignment per line, indented with tabs and commented
+    lines = ["void main() {", "\tint x;", "\tx = 0;"]
+    for i in range(statements):
+        lines.append("\tx = x + {0}; // step {1}".format(i % 10, i))
+    lines.append("\tprint(x);")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,48 @@
+import sys
+from typing import Callable, Dict, List, TextIO, Tuple
+
+from Evaluator.Evaluator import EvaluatorException
+from Evaluator.LoweringState import LoweringState
+from Evaluator.ResolverState import ResolverState
+
+
+class ClosureProgram:
+    # functions contains function name -> (Return Type, List[Parameter Type, Parameter Name], Body, line, column)
+    def __init__(self, functions: Dict[str, Tuple["TypeChecker.Types", List[Tuple["TypeChecker.Types", str]],
+                                                  "AbstractSyntax.Statement", int, int]]):
+        self.__functions = functions
+
+    @staticmethod
+    def __function(frame_size: int, params_count: int, body: Callable) -> Callable[[list], object]:
+        # the caller passes the frame with the return slot and the arguments, locals are appended here
+        padding = [None] * (frame_size - params_count - 1)
+        if body is None:
+            return lambda frame: None
+
+        def function(frame: list):
+            frame.extend(padding)
+            body(frame)
+            return frame[0]
+        return function
+
+    def lower(self, output: TextIO = None) -> Callable[[], None]:
+        # the typechecked tree is turned once into python closures, every function gets a list as call frame
+        if output is None:
+            output = sys.stdout
+        if "main" not in self.__functions.keys():
+            raise EvaluatorException("INTERPRETATION ERROR: Required function 'main' not found")
+        state = LoweringState(output)
+        resolver = ResolverState()
+        for name in self.__functions.keys():
+            ret_type, params, body, unused, unused = self.__functions[name]
+            resolver.enter_function([param_name for unused, param_name in params])
+            lowered_body = None
+            if body is not None:
+                body.resolve(resolver)
+                lowered_body = body.lower(state)
+            state.function_cell(name)[0] = self.__function(resolver.frame_size, len(params), lowered_body)
+        main = state.function_cell("main")[0]
+        return lambda: main([None])
+
+    def run(self, output: TextIO = None):
+        self.lower(output)()
@@ -7,32 +7,27 @@ class EvaluatorException(Exception):
 
 class EvaluationState:
     def __init__(self):
+        # one list of values for every function call, indexed by the slots given by the resolve pass
         self.__call_stack = list()
+        self.__frame = None
         self.__function_list = dict()
-        self.enter_scope()
 
-    def enter_scope(self):
-        self.__call_stack.insert(0, dict())
+    def enter_scope(self, frame_size: int):
+        self.__frame = [None] * frame_size
+        self.__call_stack.append(self.__frame)
 
     def exit_scope(self):
-        self.__call_stack.pop(0)
-
-    def bind(self, name: str, value: Union[int, bool]):
-        self.__call_stack[0][name] = value
-
-    def lookup(self, name: str) -> Union[int, bool, None]:
-        value: Union[int, bool, None] = None
-        for frame in self.__call_stack:
-            if name in frame.keys():
-                value = frame[name]
-                break
-        return value
-
-    def has(self, name: str) -> bool:
-        for frame in self.__call_stack:
-            if name in frame.keys():
-                return True
-        return False
+        self.__call_stack.pop()
+        self.__frame = self.__call_stack[-1] if len(self.__call_stack) > 0 else None
+
+    def bind(self, slot: int, value: Union[int, bool]):
+        self.__frame[slot] = value
+
+    def lookup(self, slot: int) -> Union[int, bool, None]:
+        return self.__frame[slot]
+
+    def has(self, slot: Union[int, None]) -> bool:
+        return slot is not None and self.__frame[slot] is not None
 
     def bind_function(self, name: str, func: tuple):
         self.__function_list[name] = func
@@ -0,0 +1,13 @@
+from typing import TextIO
+
+
+class LoweringState:
+    def __init__(self, output: TextIO):
+        self.output = output
+        self.__function_cells = dict()
+
+    def function_cell(self, name: str) -> list:
+        # functions are called through a cell, so that calls can be lowered before the called function
+        if name not in self.__function_cells.keys():
+            self.__function_cells[name] = [None]
+        return self.__function_cells[name]
@@ -0,0 +1,27 @@
+from typing import List, Union
+
+
+class ResolverState:
+    def __init__(self):
+        self.__slots = dict()
+        self.frame_size = 1
+
+    def enter_function(self, params: List[str] = None):
+        # slot 0 holds the return value, parameters follow in order, then the local variables
+        self.__slots = dict()
+        self.frame_size = 1
+        if params is not None:
+            for name in params:
+                self.bind(name)
+
+    def bind(self, name: str) -> int:
+        # prepass already renamed shadowed variables, the same name always gets the same slot
+        if name not in self.__slots.keys():
+            self.__slots[name] = self.frame_size
+            self.frame_size += 1
+        return self.__slots[name]
+
+    def lookup(self, name: str) -> Union[int, None]:
+        if name in self.__slots.keys():
+            return self.__slots[name]
+        return None
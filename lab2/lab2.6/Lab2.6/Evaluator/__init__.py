@@ -1,3 +1,6 @@
 from Evaluator.Evaluator import EvaluatorException, EvaluationState
 from Evaluator.PrepassState import PrepassState
 from Evaluator.ReturnType import ReturnType
+from Evaluator.ResolverState import ResolverState
+from Evaluator.LoweringState import LoweringState
+from Evaluator.ClosureProgram import ClosureProgram
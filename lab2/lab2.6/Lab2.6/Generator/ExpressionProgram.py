@@ -1,4 +1,4 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Set
 
 import AbstractSyntax
 from Generator import Trac42Program, GeneratorState, OpCode, Instruction, CompilerException
@@ -8,16 +8,45 @@ import TypeChecker
 class ExpressionProgram:
     # functions contains function name -> (Return Type, List[Parameter Type, Parameter Name], Body, line, column)
     def __init__(self, functions: Dict[str, Tuple["TypeChecker.Types", List[Tuple["TypeChecker.Types", str]],
-                                                  "AbstractSyntax.Statement", int, int]], decls_count: dict):
+                                                  "AbstractSyntax.Statement", int, int]], decls_count: dict,
+                 inlined: Set[str] = None, emitted: Set[str] = None):
         self.__functions = functions
         self.__decls_count = decls_count
+        # functions whose calls are compiled in place of a BSR
+        self.__inlined = inlined if inlined is not None else set()
+        # functions whose code is emitted, all of them when None
+        self.__emitted = emitted if emitted is not None else set(functions.keys())
 
-    def compile(self, first_uses: dict = None) -> Trac42Program:
+    def __new_state(self, first_uses: dict = None) -> GeneratorState:
         functs_ret_types = dict()
         for name in self.__functions.keys():
             functs_ret_types[name] = self.__functions[name][0]
         state = GeneratorState(first_uses, functs_ret_types)
-        del functs_ret_types
+        for name in self.__inlined:
+            state.inlined_functions[name] = self.__functions[name]
+        return state
+
+    def __bind_parameters(self, name: str, state: GeneratorState) -> int:
+        # parameters are above the return address and the old frame pointer, the return value above them
+        argument_offset = 2
+        for unused, param_name in self.__functions[name][1]:
+            state.offset_map[param_name] = argument_offset
+            argument_offset += 1
+        state.offset_map["return"] = argument_offset
+        return argument_offset
+
+    def compile_body(self, name: str) -> Trac42Program:
+        # the code of the body of one function alone, without its entry and exit
+        state = self.__new_state()
+        program = Trac42Program()
+        self.__bind_parameters(name, state)
+        body = self.__functions[name][2]
+        if body is not None:
+            body.compile(state, program)
+        return program
+
+    def compile(self, first_uses: dict = None) -> Trac42Program:
+        state = self.__new_state(first_uses)
         del first_uses
         program = Trac42Program()
 
@@ -36,23 +65,44 @@ class ExpressionProgram:
         program.emit(Instruction(OpCode.END))
 
         for name in self.__functions.keys():
+            if name not in self.__emitted:
+                continue
             state.next_offset = -1
+            state.frame_size = 0
             state.offset_map = {}
             state.is_return_last_function = False
             ret_type, params, body, unused, unused = self.__functions[name]
             program.emit(Instruction(OpCode.LABEL, target=name))
-            argument_offset = 2
-            for unused, param_name in params:
-                state.offset_map[param_name] = argument_offset
-                argument_offset += 1
-            return_offset = argument_offset
-            state.offset_map["return"] = return_offset
+            return_offset = self.__bind_parameters(name, state)
             program.emit(Instruction(OpCode.LINK))
             program.emit(Instruction(OpCode.LVAL, return_offset))
             if body is not None:
+                decl_address = len(program)
                 if self.__decls_count[name] > 0:
                     program.emit(Instruction(OpCode.DECL, self.__decls_count[name]))
+                state.function_name = name
+                state.function_parameters = [param_type for param_type, unused in params]
+                state.tail_call_label = state.rename_label("tail_call")
+                state.tail_calls = []
+                state.tail_call_drops_frame = self.__decls_count[name] > 0
+                tail_call_address = len(program)
                 body.compile(state, program)
+                # temporaries can need more slots than the declared variables
+                if state.frame_size > self.__decls_count[name]:
+                    if self.__decls_count[name] > 0:
+                        program.set_argument(decl_address, state.frame_size)
+                    else:
+                        program.insert(decl_address, Instruction(OpCode.DECL, state.frame_size))
+                        tail_call_address += 1
+                        state.tail_calls = [address + 1 for address in state.tail_calls]
+                if len(state.tail_calls) > 0:
+                    if state.tail_call_drops_frame:
+                        # the variables start from 0 again
+                        for address in state.tail_calls:
+                            program.set_argument(address - 1, max(state.frame_size, self.__decls_count[name]))
+                        tail_call_address = decl_address
+                    program.insert(tail_call_address, Instruction(OpCode.LABEL, target=state.tail_call_label))
+                state.tail_call_label = None
             if not state.is_return_last_function:
                 if ret_type == TypeChecker.Types.BOOL:
                     program.emit(Instruction(OpCode.ASSBOOL))
@@ -7,8 +7,23 @@ class GeneratorState:
     def __init__(self, variable_first_use: dict, functs_ret_type: dict):
         self.offset_map = {}
         self.next_offset = -1
+        # local slots used by the function being compiled, variables and temporaries
+        self.frame_size = 0
         self.__labels = {}
         self.is_return_last_function = False
+        # functions whose calls are compiled in place, name -> (Return Type, Parameters, Body, line, column)
+        self.inlined_functions = {}
+        # label after the body of the call being inlined, a return in the body leaves its value and jumps to it
+        self.inline_end_label = None
+        # function being compiled and the types of its parameters, a return of a call to it starts its body again
+        # from the label, None when its calls are compiled as calls
+        self.function_name = None
+        self.function_parameters = []
+        self.tail_call_label = None
+        # addresses of the branches of the tail calls, when the function declares variables a tail call drops the
+        # frame with a pop before its branch and the frame is declared again, as in a call
+        self.tail_calls = []
+        self.tail_call_drops_frame = False
         self.__first_use = variable_first_use
         self.__functs_ret_type = functs_ret_type
 
@@ -17,6 +32,7 @@ class GeneratorState:
 
     def bind(self, name: str):
         self.offset_map[name] = self.next_offset
+        self.frame_size = max(self.frame_size, -self.next_offset)
         self.next_offset -= 1
 
     def lookup(self, name: str) -> int:
@@ -0,0 +1,129 @@
+from typing import Callable, Dict, FrozenSet, List, Tuple, Union
+
+from Generator.CompilerException import CompilerException
+from Generator.Instruction import Instruction
+from Generator.OpCode import OpCode
+from Generator.Trac42Program import Trac42Program
+
+# instructions pushing one value without any other effect
+PUSH = frozenset((OpCode.RVALINT, OpCode.RVALBOOL, OpCode.PUSHINT, OpCode.PUSHBOOL, OpCode.LVAL))
+# instructions pushing one int that can be swapped with each other
+PUSH_INT = frozenset((OpCode.RVALINT, OpCode.PUSHINT))
+# after these instructions the execution never reaches the next one, unless it has a label
+JUMP = frozenset((OpCode.BRA, OpCode.RTS, OpCode.END))
+NOT_LABEL = frozenset(op_code for op_code in OpCode if op_code != OpCode.LABEL)
+
+Rewrite = Callable[[List[Instruction]], Union[List[Instruction], None]]
+
+
+def single(op_code: OpCode) -> FrozenSet[OpCode]:
+    return frozenset((op_code,))
+
+
+def drop_pushed_value(window: List[Instruction]) -> List[Instruction]:
+    # a value popped as soon as it is pushed is never computed
+    if window[1].get_argument() == 1:
+        return []
+    return [Instruction(OpCode.POP, window[1].get_argument() - 1)]
+
+
+def merge_pops(window: List[Instruction]) -> List[Instruction]:
+    return [Instruction(OpCode.POP, window[0].get_argument() + window[1].get_argument())]
+
+
+def remove_pair(window: List[Instruction]) -> List[Instruction]:
+    return []
+
+
+def keep_last(window: List[Instruction]) -> List[Instruction]:
+    return window[-1:]
+
+
+def keep_first(window: List[Instruction]) -> List[Instruction]:
+    return window[:1]
+
+
+def remove_neutral_constant(window: List[Instruction]) -> Union[List[Instruction], None]:
+    # x + 0, x - 0, x * 1 and x / 1 are x
+    neutral = 0 if window[1].get_op_code() in (OpCode.ADD, OpCode.SUB) else 1
+    if window[0].get_argument() == neutral:
+        return []
+    return None
+
+
+def swap_greater(window: List[Instruction]) -> List[Instruction]:
+    # a > b is b < a, a >= b is b <= a, the two operands are pushed without side effects
+    op_code = OpCode.LTINT if window[2].get_op_code() == OpCode.LEINT else OpCode.LEINT
+    return [window[1], window[0], Instruction(op_code)]
+
+
+def remove_branch_to_next(window: List[Instruction]) -> Union[List[Instruction], None]:
+    if window[0].target == window[1].target:
+        return window[1:]
+    return None
+
+
+# every rule is a name, the op codes accepted at each position of the window and the rewrite of the window,
+# a rewrite returning None leaves the window unchanged
+PEEPHOLE_RULES: List[Tuple[str, Tuple[FrozenSet[OpCode], ...], Rewrite]] = [
+    ("pushed value popped", (PUSH, single(OpCode.POP)), drop_pushed_value),
+    ("consecutive pops", (single(OpCode.POP), single(OpCode.POP)), merge_pops),
+    ("double not", (single(OpCode.NOT), single(OpCode.NOT)), remove_pair),
+    ("double negation", (single(OpCode.NEG), single(OpCode.NEG)), remove_pair),
+    ("neutral constant", (single(OpCode.PUSHINT), frozenset((OpCode.ADD, OpCode.SUB, OpCode.MULT, OpCode.DIV))),
+     remove_neutral_constant),
+    ("greater comparison", (PUSH_INT, PUSH_INT, frozenset((OpCode.LEINT, OpCode.LTINT)), single(OpCode.NOT)),
+     swap_greater),
+    # unlink drops everything above the frame pointer
+    ("dead value before unlink", (PUSH | frozenset((OpCode.POP, OpCode.DECL)), single(OpCode.UNLINK)), keep_last),
+    ("branch to next label", (single(OpCode.BRA), single(OpCode.LABEL)), remove_branch_to_next),
+    ("unreachable instruction", (JUMP, NOT_LABEL), keep_first),
+]
+
+
+class Peephole:
+    def __init__(self, rules: List[Tuple[str, Tuple[FrozenSet[OpCode], ...], Rewrite]] = None):
+        if rules is None:
+            rules = PEEPHOLE_RULES
+        self.__rules = rules
+        self.__window = max(len(pattern) for unused, pattern, unused in rules)
+        # rules indexed by the first op code they accept
+        self.__rules_by_op_code: Dict[OpCode, list] = {op_code: [] for op_code in OpCode}
+        for rule in rules:
+            for op_code in rule[1][0]:
+                self.__rules_by_op_code[op_code].append(rule)
+        self.applied: Dict[str, int] = {name: 0 for name, unused, unused in rules}
+
+    def __rewrite(self, instructions: List[Instruction], i: int) -> bool:
+        for name, pattern, rewrite in self.__rules_by_op_code[instructions[i].get_op_code()]:
+            if i + len(pattern) > len(instructions):
+                continue
+            window = instructions[i:i + len(pattern)]
+            if all(instruction.get_op_code() in op_codes for instruction, op_codes in zip(window, pattern)):
+                replacement = rewrite(window)
+                if replacement is not None:
+                    instructions[i:i + len(pattern)] = replacement
+                    self.applied[name] += 1
+                    return True
+        return False
+
+    def optimize(self, program: Trac42Program) -> Trac42Program:
+        # the rules are applied until none of them matches
+        if program.is_linked():
+            raise CompilerException("The peephole pass runs before the program is linked")
+        instructions = program.get_instructions()
+        changed = True
+        while changed:
+            changed = False
+            i = 0
+            while i < len(instructions):
+                if self.__rewrite(instructions, i):
+                    changed = True
+                    # the rewrite can complete a pattern starting a few instructions before
+                    i = max(0, i - self.__window + 1)
+                else:
+                    i += 1
+        optimized = Trac42Program()
+        for instruction in instructions:
+            optimized.emit(instruction)
+        return optimized
@@ -1,27 +1,155 @@
+import io
+import sys
+from array import array
+from typing import List, TextIO
+
 import Generator.Instruction as Instruction
+from Generator.Instruction import FORMATS
 from Generator.OpCode import OpCode
+from Generator.CompilerException import CompilerException
+
+# op codes are stored as their position in this list
+OP_CODES = list(OpCode)
+OP_CODE_INDEX = {op_code: index for index, op_code in enumerate(OP_CODES)}
+LABEL = OP_CODE_INDEX[OpCode.LABEL]
+BRANCHES = frozenset(OP_CODE_INDEX[op_code] for op_code in (OpCode.BSR, OpCode.BRF, OpCode.BRA))
+PUSHBOOL = OP_CODE_INDEX[OpCode.PUSHBOOL]
+BOOLEANS = ("false", "true")
+# a whole line of the listing for every op code, formatted with a single call
+LINE_FORMATS = ["{0}\t" + FORMATS[op_code] + "\n" for op_code in OP_CODES]
+# instructions written to the output with a single call
+WRITE_CHUNK = 1 << 12
+NO_TARGET = -1
+# an argument outside 64 bits is kept in a dict by address, the array holds this value in its place
+WIDE_ARGUMENT = -(1 << 63)
+ARGUMENT_LIMIT = 1 << 63
 
 
 class Trac42Program:
     def __init__(self):
-        self.__program = list()
+        # one entry per instruction in each array, targets are label numbers until the program is linked,
+        # then branches target the address of their label
+        self.__op_codes = array('B')
+        self.__arguments = array('q')
+        self.__wide_arguments = dict()
+        self.__targets = array('i')
+        self.__labels = list()
+        self.__label_numbers = dict()
+        self.__linked = False
+
+    def __label_number(self, name: str) -> int:
+        number = self.__label_numbers.get(name)
+        if number is None:
+            number = len(self.__labels)
+            self.__labels.append(sys.intern(name))
+            self.__label_numbers[name] = number
+        return number
 
     def link(self):
-        link_map = {}
-        for i in range(len(self.__program)):
-            if self.__program[i].get_op_code() == OpCode.LABEL:
-                link_map[self.__program[i].target] = i
+        if self.__linked:
+            return
+        addresses = [NO_TARGET] * len(self.__labels)
+        op_codes = self.__op_codes
+        targets = self.__targets
+        for i in range(len(op_codes)):
+            if op_codes[i] == LABEL:
+                addresses[targets[i]] = i
+
+        for i in range(len(op_codes)):
+            if op_codes[i] in BRANCHES:
+                address = addresses[targets[i]]
+                if address == NO_TARGET:
+                    raise CompilerException("Undefined label {0}".format(self.__labels[targets[i]]))
+                targets[i] = address
+        self.__linked = True
 
-        for instruction in self.__program:
-            if instruction.get_op_code() == OpCode.BSR or instruction.get_op_code() == OpCode.BRF or \
-                    instruction.get_op_code() == OpCode.BRA:
-                instruction.target = link_map[instruction.target]
+    def is_linked(self) -> bool:
+        return self.__linked
 
     def emit(self, instruction: Instruction):
-        self.__program.append(instruction)
+        op_code = OP_CODE_INDEX[instruction.get_op_code()]
+        argument = instruction.get_argument()
+        if argument is None:
+            argument = 0
+        elif op_code == PUSHBOOL:
+            argument = BOOLEANS.index(argument)
+        if not WIDE_ARGUMENT < argument < ARGUMENT_LIMIT:
+            self.__wide_arguments[len(self.__op_codes)] = argument
+            argument = WIDE_ARGUMENT
+        self.__arguments.append(argument)
+        self.__op_codes.append(op_code)
+        target = instruction.target
+        self.__targets.append(NO_TARGET if target is None else self.__label_number(target))
+
+    def __stored_argument(self, address: int, argument: int) -> int:
+        # the value the array holds for the argument of the instruction at the address
+        if WIDE_ARGUMENT < argument < ARGUMENT_LIMIT:
+            self.__wide_arguments.pop(address, None)
+            return argument
+        self.__wide_arguments[address] = argument
+        return WIDE_ARGUMENT
+
+    def set_argument(self, address: int, argument: int):
+        self.__arguments[address] = self.__stored_argument(address, argument)
+
+    def insert(self, address: int, instruction: Instruction):
+        # only before linking, addresses after the new instruction move by one
+        self.emit(instruction)
+        self.__op_codes.insert(address, self.__op_codes.pop())
+        self.__arguments.insert(address, self.__arguments.pop())
+        self.__targets.insert(address, self.__targets.pop())
+        if len(self.__wide_arguments) > 0:
+            inserted = self.__wide_arguments.pop(len(self.__op_codes) - 1, None)
+            self.__wide_arguments = {other + 1 if other >= address else other: argument
+                                     for other, argument in self.__wide_arguments.items()}
+            if inserted is not None:
+                self.__wide_arguments[address] = inserted
+
+    def __target(self, op_code: int, target: int):
+        # labels keep their name, branches target an address once linked
+        if target == NO_TARGET:
+            return None
+        if op_code == LABEL or not self.__linked:
+            return self.__labels[target]
+        return target
+
+    def __argument(self, address: int, op_code: int, argument: int):
+        if op_code == PUSHBOOL:
+            return BOOLEANS[argument]
+        if argument == WIDE_ARGUMENT:
+            return self.__wide_arguments[address]
+        return argument
+
+    def get_instructions(self) -> List[Instruction]:
+        # a copy of the program as instruction objects
+        return [Instruction.Instruction(OP_CODES[op_code], self.__argument(address, op_code, argument),
+                                        self.__target(op_code, target))
+                for address, op_code, argument, target in zip(range(len(self.__op_codes)), self.__op_codes,
+                                                              self.__arguments, self.__targets)]
+
+    def memory_size(self) -> int:
+        # bytes used by the instruction arrays
+        return sum(values.itemsize * len(values) for values in (self.__op_codes, self.__arguments, self.__targets))
+
+    def __len__(self):
+        return len(self.__op_codes)
+
+    def write(self, output: TextIO):
+        # the listing is streamed a chunk at a time, it is never built as a whole in memory
+        labels = self.__labels
+        linked = self.__linked
+        wide_arguments = self.__wide_arguments
+        for start in range(0, len(self.__op_codes), WRITE_CHUNK):
+            end = start + WRITE_CHUNK
+            output.write("".join([
+                LINE_FORMATS[op_code].format(
+                    i, labels[target] if op_code == LABEL or (not linked and target != NO_TARGET) else target,
+                    BOOLEANS[argument] if op_code == PUSHBOOL else
+                    wide_arguments[i] if argument == WIDE_ARGUMENT else argument)
+                for i, op_code, argument, target in zip(range(start, end), self.__op_codes[start:end],
+                                                        self.__arguments[start:end], self.__targets[start:end])]))
 
     def __str__(self):
-        out = ""
-        for i in range(len(self.__program)):
-            out += str(i)+"\t"+str(self.__program[i])+"\n"
-        return out
+        out = io.StringIO()
+        self.write(out)
+        return out.getvalue()
@@ -4,3 +4,4 @@ from Generator.OpCode import OpCode
 from Generator.GeneratorState import GeneratorState
 from Generator.ExpressionProgram import ExpressionProgram
 from Generator.CompilerException import CompilerException
+from Generator.Peephole import Peephole
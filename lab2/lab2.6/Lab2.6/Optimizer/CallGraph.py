@@ -0,0 +1,36 @@
+from typing import Dict, List, Set
+
+import AbstractSyntax
+
+
+class CallGraph:
+    # the functions called by every function, found by walking its body without changing it, print is not a function
+    def __init__(self, functions: List["AbstractSyntax.Statement"]):
+        self.calls: Dict[str, Set[str]] = dict()
+        for function in functions:
+            if type(function) != AbstractSyntax.FunctionDeclaration:
+                continue
+            self.calls.setdefault(function.get_name(), set()).update(
+                node.get_name() for node in function.walk()
+                if type(node) == AbstractSyntax.FunctionCallExpression and node.get_name() != "print")
+
+    def reachable(self, root: str = "main", inlined: Set[str] = None) -> Set[str]:
+        # functions whose code is needed by a program starting from root, the body of an inlined function is compiled
+        # in the functions calling it, the functions it calls are reached through them, without a root every
+        # function is kept and the missing root is reported by the passes after
+        if root not in self.calls:
+            return set(self.calls.keys())
+        if inlined is None:
+            inlined = set()
+        reached = {root}
+        visited = {root}
+        stack = [root]
+        while len(stack) > 0:
+            for callee in self.calls.get(stack.pop(), ()):
+                if callee in visited:
+                    continue
+                visited.add(callee)
+                stack.append(callee)
+                if callee not in inlined:
+                    reached.add(callee)
+        return reached
@@ -0,0 +1,64 @@
+from typing import Dict, List, Set, Tuple
+
+import AbstractSyntax
+import Generator
+import TypeChecker
+
+# largest body, in instructions, of a function whose calls are inlined, 0 inlines no call
+INLINE_THRESHOLD = 24
+
+
+class Inliner:
+    # chooses the functions whose calls are compiled in place of a BSR: small functions without local variables
+    # that can not reach themselves through their calls, a function returning a value has to end with a return
+    # functions contains function name -> (Return Type, List[Parameter Type, Parameter Name], Body, line, column)
+    def __init__(self, functions: Dict[str, Tuple["TypeChecker.Types", List[Tuple["TypeChecker.Types", str]],
+                                                  "AbstractSyntax.Statement", int, int]],
+                 decls_count: Dict[str, int], threshold: int = INLINE_THRESHOLD):
+        self.__functions = functions
+        self.__decls_count = decls_count
+        self.__threshold = threshold
+        # instructions of the body of every function and the functions it calls, compiled without inlining
+        self.sizes: Dict[str, int] = dict()
+        self.callees: Dict[str, Set[str]] = dict()
+
+    def run(self) -> Set[str]:
+        if self.__threshold <= 0:
+            return set()
+        program = Generator.ExpressionProgram(self.__functions, self.__decls_count)
+        for name in self.__functions.keys():
+            body = program.compile_body(name)
+            self.sizes[name] = len(body)
+            self.callees[name] = {instruction.target for instruction in body.get_instructions()
+                                  if instruction.get_op_code() == Generator.OpCode.BSR}
+        return {name for name in self.__functions.keys() if self.__can_inline(name)}
+
+    def __can_inline(self, name: str) -> bool:
+        ret_type, unused, body, unused, unused = self.__functions[name]
+        if name == "main" or self.__decls_count.get(name, 0) > 0 or self.sizes[name] > self.__threshold:
+            return False
+        if ret_type != TypeChecker.Types.VOID and not self.__ends_with_return(body):
+            return False
+        return not self.__is_recursive(name)
+
+    @staticmethod
+    def __ends_with_return(body: "AbstractSyntax.Statement") -> bool:
+        # every path of the body reaches its last statement unless it returned before
+        if type(body) == AbstractSyntax.SequenceStatement:
+            statements = body.get_statements()
+            return len(statements) > 0 and type(statements[-1]) == AbstractSyntax.ReturnStatement
+        return type(body) == AbstractSyntax.ReturnStatement
+
+    def __is_recursive(self, name: str) -> bool:
+        # the function is reached again from the functions it calls
+        visited = set()
+        stack = list(self.callees[name])
+        while len(stack) > 0:
+            callee = stack.pop()
+            if callee == name:
+                return True
+            if callee in visited or callee not in self.callees:
+                continue
+            visited.add(callee)
+            stack.extend(self.callees[callee])
+        return False
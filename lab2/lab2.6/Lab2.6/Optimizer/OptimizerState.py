@@ -8,6 +8,7 @@ class OptimizerState:
         self.__constants = None
         self.__params = None
         self.__constants_to_delete = None
+        self.__loop_variables = None
         self.__warning_list = list()
         self.first_uses = dict()
         self.start_again = False
@@ -15,13 +16,18 @@ class OptimizerState:
         self.__lookup_variable = False
         self.__decl_count = 0
         self.is_last_return = False
+        self.node_visits = 0
         self.new_scope()
 
     def new_scope(self):
+        # a new pass over the program, node_visits counts the nodes optimized by the pass
+        self.node_visits = 0
         self.start_again = False
         self.__variables = dict()
         self.__constants = dict()
         self.__params = dict()
+        # variables assigned in a loop, their value is not known from the start of the loop to the end of the pass
+        self.__loop_variables = set()
         self.ignore_next = -1
         self.__decl_count = 0
         self.is_last_return = False
@@ -45,7 +51,9 @@ class OptimizerState:
             use = Optimizer.FirstUseType.UNUSED
         if var in self.__variables.keys() and self.__variables[var][2] != Optimizer.FirstUseType.UNUSED:
             use = self.__variables[var][2]
-        if var in self.__constants.keys() and self.__constants[var] is not None:
+        if var in self.__loop_variables:
+            pass
+        elif var in self.__constants.keys() and self.__constants[var] is not None:
             del self.__constants[var]
         else:
             # type consistency checked by the typechecker, variable type cannot change
@@ -74,6 +82,9 @@ class OptimizerState:
         return self.__variables[var][0]
 
     def lookup_constant(self, var: str) -> Union[int, bool]:
+        if var in self.__loop_variables:
+            self.__lookup_variable = False
+            raise OptimizerStateException("Variable {0} is assigned in a loop".format(var))
         if self.__lookup_variable:
             self.__lookup_variable = False
             if var not in self.__params.keys():
@@ -109,6 +120,12 @@ class OptimizerState:
         if var not in self.__variables.keys():
             raise Exception("Impossible delete of undefined varaible")
 
+    def assign_in_loop(self, var: str):
+        # the loop can run any number of times, the variable is never a constant again in this pass
+        self.__loop_variables.add(var)
+        if var in self.__constants.keys():
+            del self.__constants[var]
+
     def add_warning(self, msg: str):
         if msg not in self.__warning_list:
             self.__warning_list.append(msg)
@@ -0,0 +1,45 @@
+from collections import deque
+from typing import Dict, List, Tuple
+
+import AbstractSyntax
+import Optimizer
+from Optimizer.OptimizerState import OptimizerState
+
+
+class ProgramOptimizer:
+    # every function has its own state and is optimized until its pass leaves no constant to delete, a function
+    # that reached its fixpoint is not visited again when another one needs more passes
+    def __init__(self, functions: List["AbstractSyntax.FunctionDeclaration"]):
+        self.__functions = functions
+        # name of the function and node visits of every pass, in the order they ran
+        self.passes: List[Tuple[str, int]] = list()
+        self.first_uses: Dict[str, "Optimizer.FirstUseType"] = dict()
+        self.decls_count: Dict[str, int] = dict()
+        self.__warnings = list()
+
+    def run(self):
+        states = [OptimizerState() for unused in self.__functions]
+        worklist = deque(range(len(self.__functions)))
+        while len(worklist) > 0:
+            index = worklist.popleft()
+            state = states[index]
+            state.new_scope()
+            self.__functions[index].optimize(state)
+            state.assign_constants_to_delete()
+            self.passes.append((self.__functions[index].get_name(), state.node_visits))
+            if state.start_again:
+                worklist.append(index)
+        for function, state in zip(self.__functions, states):
+            # the first function using a name decides its first use, as when one state was shared
+            for name, use in state.first_uses.items():
+                self.first_uses.setdefault(name, use)
+            self.decls_count.update(function.get_decl_count())
+            for message in state.get_warnings():
+                if message not in self.__warnings:
+                    self.__warnings.append(message)
+
+    def get_warnings(self) -> List[str]:
+        return self.__warnings
+
+    def get_node_visits(self) -> int:
+        return sum(visits for unused, visits in self.passes)
@@ -1,2 +1,5 @@
 from Optimizer.OptimizerState import OptimizerState, OptimizerStateException
 from Optimizer.FirstUseType import FirstUseType
+from Optimizer.ProgramOptimizer import ProgramOptimizer
+from Optimizer.Inliner import Inliner, INLINE_THRESHOLD
+from Optimizer.CallGraph import CallGraph
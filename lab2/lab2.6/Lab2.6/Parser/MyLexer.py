@@ -1,3 +1,4 @@
+import bisect
 import re
 
 from Parser.sly import Lexer
@@ -60,8 +61,27 @@ class MyLexer(Lexer):
         exit(-1)
 
 
-def find_column(string, token):
-    split = re.split(r'\r\n|\r|\n', string[:token.index])  # divide by lines until start of the token
-    string = split[len(split) - 1]  # taken line before the token start
-    string = re.sub(r'\t', '        ', string)  # replaced tabs with 8 spaces (if present)
-    return len(string) + 1  # token starting position = length of the string before the token + 1
+class ColumnIndex:
+    def __init__(self, string: str):
+        self.__string = string
+        # offset of the first character of every line, computed once for the whole source
+        self.__line_starts = [0]
+        for newline in re.finditer(r'\r\n|\r|\n', string):
+            self.__line_starts.append(newline.end())
+        # offset of the last token and tabs before it on its line, tokens come in order and the tabs of a long line
+        # are not counted again for every token
+        self.__last_index = 0
+        self.__last_tabs = 0
+
+    def find_column(self, token) -> int:
+        line_start = self.__line_starts[bisect.bisect_right(self.__line_starts, token.index) - 1]
+        start = line_start
+        tabs = 0
+        if line_start <= self.__last_index <= token.index:
+            start = self.__last_index
+            tabs = self.__last_tabs
+        # tabs are counted as 8 spaces
+        tabs += self.__string.count('\t', start, token.index)
+        self.__last_index = token.index
+        self.__last_tabs = tabs
+        return token.index - line_start + 7 * tabs + 1
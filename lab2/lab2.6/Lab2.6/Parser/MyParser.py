@@ -1,3 +1,5 @@
+import os
+
 from AbstractSyntax import *
 from Parser import *
 from Parser.Type import UnaryOperatorType, BinaryOperatorType
@@ -8,12 +10,23 @@ class MyParser(Parser):
     def get_precedence(self):
         return self.precedence
 
-    def __init__(self, token__list):
-        self.__token_list = token__list
+    def __init__(self):
+        # only the last token read is kept, to report where the source ended
+        self.__last_token = None
+
+    def __track_last_token(self, tokens):
+        for token in tokens:
+            self.__last_token = token
+            yield token
+
+    def parse(self, tokens):
+        return super().parse(self.__track_last_token(tokens))
 
     # Get the token list from the lexer
     tokens = MyLexer.tokens
     # debugfile = 'parser.out'
+    # LALR tables are cached next to this module and rebuilt only when the grammar changes
+    tablefile = os.path.join(os.path.dirname(__file__), 'parsetab.pickle')
     precedence = (
         ('right', ASSIGN),
         ('left', OR),
@@ -34,13 +47,14 @@ class MyParser(Parser):
             return "", False
         return p[0], True
 
-    @_('Decl Decls', '')
+    # sequences are left recursive, every declaration or statement is appended to the sequence already parsed
+    @_('Decls Decl', '')
     def Decls(self, p):
         if len(p) == 0:
             return ""
-        if len(p) == 2:
-            return SequenceStatement(p[0], p[1])
-        return p[0]
+        if p[0] == "":
+            return SequenceStatement([p[1]])
+        return p[0].append(p[1])
 
     @_('Type IDENTIFIER LEFTROUNDPARENTHESES FormalList RIGHTROUNDPARENTHESES LEFTCURLYBRACKET Stmts RIGHTCURLYBRACKET',
        'VOID IDENTIFIER LEFTROUNDPARENTHESES FormalList RIGHTROUNDPARENTHESES LEFTCURLYBRACKET Stmts RIGHTCURLYBRACKET')
@@ -104,12 +118,11 @@ class MyParser(Parser):
     def Stmts(self, p):
         if len(p) == 0:
             return None
-        if len(p) == 2 and p[0] is not None and p[1] is not None:
-            return SequenceStatement(p[0], p[1])
-        if p[1] is not None:
-            return SequenceStatement(p[1])
-        if p[0] is not None:
-            return SequenceStatement(p[0])
+        if p[1] is None:
+            return p[0]
+        if p[0] is None:
+            return SequenceStatement([p[1]])
+        return p[0].append(p[1])
 
     @_('NUMBER')
     def Expr(self, p):
@@ -163,6 +176,6 @@ class MyParser(Parser):
             print(f'Syntax error, unespected {token.value} on line {token.lineno} column {token.index}')
         else:
             # EOF reached
-            last_element = self.__token_list[-1]
+            last_element = self.__last_token
             print(f'Syntax error, unexpected EOF on line {last_element.lineno} column {last_element.index + 1}.')
         exit(-2)
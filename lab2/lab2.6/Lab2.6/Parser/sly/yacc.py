@@ -31,7 +31,10 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # -----------------------------------------------------------------------------
 
+import hashlib
 import inspect
+import os
+import pickle
 import sys
 from collections import OrderedDict, defaultdict
 
@@ -54,6 +57,7 @@ class YaccError(Exception):
 
 ERROR_COUNT = 3  # Number of symbols that must be shifted to leave recovery mode
 MAXINT = sys.maxsize
+TABLE_VERSION = 1  # Version of the table file format, bump it to invalidate old table files
 
 
 # This object is a stand-in for a logging object created by the
@@ -1577,6 +1581,19 @@ class LRTable(object):
         return '\n'.join(out)
 
 
+class CachedLRTable(object):
+    '''
+    LR parsing tables read back from a table file.  Only the parts needed
+    by the parsing runtime are kept.
+    '''
+    def __init__(self, lr_action, lr_goto, defaulted_states, num_sr, num_rr):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+        self.num_sr = num_sr
+        self.num_rr = num_rr
+
+
 # Collect grammar rules from a function
 def _collect_grammar_rules(func):
     grammar = []
@@ -1860,6 +1877,9 @@ class Parser(metaclass=ParserMeta):
     # Debugging filename where parsetab.out data can be written
     debugfile = None
 
+    # Filename where the LR tables are cached between runs
+    tablefile = None
+
     @classmethod
     def __validate_tokens(cls):
         if not hasattr(cls, 'tokens'):
@@ -1998,25 +2018,79 @@ class Parser(metaclass=ParserMeta):
         Build the LR Parsing tables from the grammar
         '''
         lrtable = LRTable(cls._grammar)
-        num_sr = len(lrtable.sr_conflicts)
+        cls.__report_conflicts(len(lrtable.sr_conflicts), len(lrtable.rr_conflicts))
+        cls._lrtable = lrtable
+        return True
 
-        # Report shift/reduce and reduce/reduce conflicts
+    @classmethod
+    def __report_conflicts(cls, num_sr, num_rr):
+        '''
+        Report shift/reduce and reduce/reduce conflicts
+        '''
         if num_sr != getattr(cls, 'expected_shift_reduce', None):
             if num_sr == 1:
                 cls.log.warning('1 shift/reduce conflict')
             elif num_sr > 1:
                 cls.log.warning('%d shift/reduce conflicts', num_sr)
 
-        num_rr = len(lrtable.rr_conflicts)
         if num_rr != getattr(cls, 'expected_reduce_reduce', None):
             if num_rr == 1:
                 cls.log.warning('1 reduce/reduce conflict')
             elif num_rr > 1:
                 cls.log.warning('%d reduce/reduce conflicts', num_rr)
 
+    @classmethod
+    def __grammar_signature(cls):
+        '''
+        Hash of everything the LR tables are computed from
+        '''
+        productions = [(p.name, p.prod, p.prec) for p in cls._grammar.Productions]
+        precedence = sorted(cls._grammar.Precedence.items())
+        spec = repr((TABLE_VERSION, sorted(cls._grammar.Terminals), precedence, productions, cls._grammar.Start))
+        return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def __read_lrtables(cls):
+        '''
+        Load the LR tables from the table file. Returns False if there is no
+        table file or if it was written for a different grammar.
+        '''
+        try:
+            with open(cls.tablefile, 'rb') as f:
+                signature, tables = pickle.load(f)
+        except Exception:
+            return False
+        if signature != cls.__grammar_signature():
+            return False
+        lrtable = CachedLRTable(*tables)
+        cls.__report_conflicts(lrtable.num_sr, lrtable.num_rr)
         cls._lrtable = lrtable
         return True
 
+    @classmethod
+    def __write_lrtables(cls):
+        '''
+        Write the LR tables to the table file. The file is replaced atomically
+        so that concurrent builds never read a partial table file.
+        '''
+        lrtable = cls._lrtable
+        tables = (lrtable.lr_action, lrtable.lr_goto, lrtable.defaulted_states,
+                  len(lrtable.sr_conflicts), len(lrtable.rr_conflicts))
+        tmpfile = f'{cls.tablefile}.{os.getpid()}.tmp'
+        try:
+            with open(tmpfile, 'wb') as f:
+                pickle.dump((cls.__grammar_signature(), tables), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, cls.tablefile)
+        except OSError as e:
+            cls.log.warning('Unable to write parsing tables to %s: %s', cls.tablefile, e)
+        finally:
+            # Once replaced the temporary file is gone, it is only left by a failed write
+            if os.path.exists(tmpfile):
+                try:
+                    os.remove(tmpfile)
+                except OSError:
+                    pass
+
     @classmethod
     def __collect_rules(cls, definitions):
         '''
@@ -2046,9 +2120,13 @@ class Parser(metaclass=ParserMeta):
         # Build the underlying grammar object
         cls.__build_grammar(rules)
 
-        # Build the LR tables
-        if not cls.__build_lrtables():
-            raise YaccError('Can\'t build parsing tables')
+        # Build the LR tables, unless the table file holds the ones of this grammar.
+        # The debug file needs the full tables, so they are always rebuilt then
+        if not cls.tablefile or cls.debugfile or not cls.__read_lrtables():
+            if not cls.__build_lrtables():
+                raise YaccError('Can\'t build parsing tables')
+            if cls.tablefile:
+                cls.__write_lrtables()
 
         if cls.debugfile:
             with open(cls.debugfile, 'w') as f:
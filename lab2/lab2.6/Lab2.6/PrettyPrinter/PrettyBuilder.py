@@ -7,7 +7,8 @@ from AbstractSyntax import Statement, Expression
 class PrettyBuilder:
     def __init__(self):
         self.__indent = 0
-        self.__string = ""
+        # the pieces are joined once, appending to a string copies it every time
+        self.__strings = list()
 
     def indent(self) -> None:
         self.__indent += 2
@@ -16,7 +17,7 @@ class PrettyBuilder:
         self.__indent -= 2
 
     def append(self, string: str) -> None:
-        self.__string += string
+        self.__strings.append(string)
 
     def new_line(self) -> None:
         self.append("\n")
@@ -38,4 +39,4 @@ class PrettyBuilder:
         pass
 
     def __str__(self):
-        return self.__string
+        return "".join(self.__strings)
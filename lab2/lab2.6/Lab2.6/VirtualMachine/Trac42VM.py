@@ -0,0 +1,237 @@
+import sys
+from typing import List, TextIO, Tuple
+
+import Generator
+from Generator.OpCode import OpCode
+from VirtualMachine.VirtualMachineException import VirtualMachineException
+
+# integer opcodes used by the dispatch loop, numbered in order of how often they are executed
+RVAL = 0
+LVAL = 1
+PUSH = 2
+ASSIGN = 3
+ADD = 4
+BRF = 5
+BRA = 6
+SUB = 7
+LTINT = 8
+LEINT = 9
+EQUAL = 10
+BSR = 11
+LINK = 12
+UNLINK = 13
+RTS = 14
+DECL = 15
+POP = 16
+NOT = 17
+MULT = 18
+DIV = 19
+AND = 20
+OR = 21
+NEG = 22
+WRITEINT = 23
+WRITEBOOL = 24
+END = 25
+
+# int and bool variants share the same implementation, values are plain python ints and bools
+OP_CODES = {
+    OpCode.RVALINT: RVAL,
+    OpCode.RVALBOOL: RVAL,
+    OpCode.LVAL: LVAL,
+    OpCode.PUSHINT: PUSH,
+    OpCode.PUSHBOOL: PUSH,
+    OpCode.ASSINT: ASSIGN,
+    OpCode.ASSBOOL: ASSIGN,
+    OpCode.ADD: ADD,
+    OpCode.BRF: BRF,
+    OpCode.BRA: BRA,
+    OpCode.SUB: SUB,
+    OpCode.LTINT: LTINT,
+    OpCode.LEINT: LEINT,
+    OpCode.EQINT: EQUAL,
+    OpCode.EQBOOL: EQUAL,
+    OpCode.BSR: BSR,
+    OpCode.LINK: LINK,
+    OpCode.UNLINK: UNLINK,
+    OpCode.RTS: RTS,
+    OpCode.DECL: DECL,
+    OpCode.POP: POP,
+    OpCode.NOT: NOT,
+    OpCode.MULT: MULT,
+    OpCode.DIV: DIV,
+    OpCode.AND: AND,
+    OpCode.OR: OR,
+    OpCode.NEG: NEG,
+    OpCode.WRITEINT: WRITEINT,
+    OpCode.WRITEBOOL: WRITEBOOL,
+    OpCode.END: END
+}
+
+
+class Trac42VM:
+    def __init__(self, program: "Generator.Trac42Program", stack_size: int = 1 << 12):
+        self.__op_codes, self.__arguments, self.__addresses = self.__load(program.get_instructions())
+        self.__stack_size = stack_size
+        self.executed_instructions = 0
+
+    @staticmethod
+    def __load(instructions: List["Generator.Instruction"]) -> Tuple[List[int], list, List[int]]:
+        # labels are removed, every instruction gets its index in the label free code
+        new_index = list()
+        count = 0
+        for instruction in instructions:
+            new_index.append(count)
+            if instruction.get_op_code() != OpCode.LABEL:
+                count += 1
+        new_index.append(count)
+
+        op_codes = list()
+        arguments = list()
+        addresses = list()
+        for address in range(len(instructions)):
+            op_code = instructions[address].get_op_code()
+            if op_code == OpCode.LABEL:
+                continue
+            if op_code not in OP_CODES.keys():
+                raise VirtualMachineException("Unknown instruction {0} at {1}".format(op_code, address))
+            if op_code in (OpCode.BSR, OpCode.BRF, OpCode.BRA):
+                target = instructions[address].target
+                if type(target) != int:
+                    raise VirtualMachineException("Unlinked target {0} at {1}, link the program before running it"
+                                                  .format(target, address))
+                # a branch to a label jumps to the first instruction after it
+                argument = new_index[target]
+            elif op_code in (OpCode.LVAL, OpCode.RVALINT, OpCode.RVALBOOL):
+                # the stack grows upwards, so frame offsets are mirrored: n(FP) is stack[fp - n]
+                argument = -int(instructions[address].get_argument())
+            elif op_code == OpCode.PUSHBOOL:
+                argument = instructions[address].get_argument() == "true"
+            elif op_code in (OpCode.PUSHINT, OpCode.POP, OpCode.DECL):
+                argument = int(instructions[address].get_argument())
+            else:
+                argument = None
+            op_codes.append(OP_CODES[op_code])
+            arguments.append(argument)
+            addresses.append(address)
+        # guard for branches to a label at the end of the program
+        op_codes.append(END)
+        arguments.append(None)
+        addresses.append(len(instructions))
+        return op_codes, arguments, addresses
+
+    def run(self, output: TextIO = None) -> int:
+        if output is None:
+            output = sys.stdout
+        write = output.write
+        op_codes = self.__op_codes
+        arguments = self.__arguments
+        stack = [0] * self.__stack_size
+        pc = 0
+        sp = -1
+        fp = -1
+        executed = 0
+        while True:
+            try:
+                # every instruction writes the stack before changing sp, fp or pc, so that an instruction
+                # overflowing the stack can be executed again once the stack has grown
+                while True:
+                    op_code = op_codes[pc]
+                    argument = arguments[pc]
+                    pc += 1
+                    executed += 1
+                    if op_code == RVAL:
+                        stack[sp + 1] = stack[fp + argument]
+                        sp += 1
+                    elif op_code == LVAL:
+                        stack[sp + 1] = fp + argument
+                        sp += 1
+                    elif op_code == PUSH:
+                        stack[sp + 1] = argument
+                        sp += 1
+                    elif op_code == ASSIGN:
+                        stack[stack[sp - 1]] = stack[sp]
+                        sp -= 2
+                    elif op_code == ADD:
+                        stack[sp - 1] += stack[sp]
+                        sp -= 1
+                    elif op_code == BRF:
+                        sp -= 1
+                        if not stack[sp + 1]:
+                            pc = argument
+                    elif op_code == BRA:
+                        pc = argument
+                    elif op_code == SUB:
+                        stack[sp - 1] -= stack[sp]
+                        sp -= 1
+                    elif op_code == LTINT:
+                        stack[sp - 1] = stack[sp - 1] < stack[sp]
+                        sp -= 1
+                    elif op_code == LEINT:
+                        stack[sp - 1] = stack[sp - 1] <= stack[sp]
+                        sp -= 1
+                    elif op_code == EQUAL:
+                        stack[sp - 1] = stack[sp - 1] == stack[sp]
+                        sp -= 1
+                    elif op_code == BSR:
+                        stack[sp + 1] = pc
+                        sp += 1
+                        pc = argument
+                    elif op_code == LINK:
+                        stack[sp + 1] = fp
+                        sp += 1
+                        fp = sp
+                    elif op_code == UNLINK:
+                        sp = fp - 1
+                        fp = stack[fp]
+                    elif op_code == RTS:
+                        pc = stack[sp]
+                        sp -= 1
+                    elif op_code == DECL:
+                        stack[sp + argument] = 0
+                        for i in range(sp + 1, sp + argument):
+                            stack[i] = 0
+                        sp += argument
+                    elif op_code == POP:
+                        sp -= argument
+                    elif op_code == NOT:
+                        stack[sp] = not stack[sp]
+                    elif op_code == MULT:
+                        stack[sp - 1] *= stack[sp]
+                        sp -= 1
+                    elif op_code == DIV:
+                        left = stack[sp - 1]
+                        right = stack[sp]
+                        # integer division truncates towards 0
+                        if (left < 0) == (right < 0):
+                            stack[sp - 1] = left // right
+                        else:
+                            stack[sp - 1] = -(-left // right)
+                        sp -= 1
+                    elif op_code == AND:
+                        stack[sp - 1] = stack[sp - 1] and stack[sp]
+                        sp -= 1
+                    elif op_code == OR:
+                        stack[sp - 1] = stack[sp - 1] or stack[sp]
+                        sp -= 1
+                    elif op_code == NEG:
+                        stack[sp] = -stack[sp]
+                    elif op_code == WRITEINT:
+                        write(str(stack[sp]) + "\n")
+                    elif op_code == WRITEBOOL:
+                        write("True\n" if stack[sp] else "False\n")
+                    else:
+                        self.executed_instructions = executed
+                        return executed
+            except IndexError:
+                top = sp + 1
+                if op_codes[pc - 1] == DECL:
+                    top = sp + arguments[pc - 1]
+                if top < len(stack):
+                    raise VirtualMachineException("Invalid stack access at {0}"
+                                                  .format(self.__addresses[pc - 1]))
+                # grow the stack and run again the instruction that did not fit
+                pc -= 1
+                executed -= 1
+                stack.extend([0] * len(stack))
+            except ZeroDivisionError:
+                raise VirtualMachineException("Division by 0 at {0}".format(self.__addresses[pc - 1]))
@@ -0,0 +1,2 @@
+from VirtualMachine.VirtualMachineException import VirtualMachineException
+from VirtualMachine.Trac42VM import Trac42VM
@@ -0,0 +1,118 @@
+import functools
+import io
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Iterator, List, Tuple
+
+from main import compile_program, failure_message, is_compile_option, parse_compile_options, remove_comments
+import TypeChecker
+
+SOURCE_EXTENSION = ".t42"
+OUTPUT_EXTENSION = ".trac42"
+ERROR_EXTENSION = ".err"
+
+
+def find_sources(paths: List[str]) -> List[Tuple[str, str]]:
+    # every source is paired with the name of its outputs, files of a folder are grouped in a sub folder
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            folder = os.path.basename(os.path.normpath(path))
+            for name in sorted(os.listdir(path)):
+                if name.endswith(SOURCE_EXTENSION):
+                    sources.append((os.path.join(path, name), os.path.join(folder, os.path.splitext(name)[0])))
+        else:
+            sources.append((path, os.path.splitext(os.path.basename(path))[0]))
+    return sources
+
+
+def compile_source(string: str, options: dict = None) -> Tuple[str, str, str]:
+    # returns the status and what main.py would print on stdout and stderr for the same source and options
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = "ok"
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            compiled_program = compile_program(remove_comments(string), **(options or {}))
+            if compiled_program is not None:
+                compiled_program.write(sys.stdout)
+                print()
+        except TypeChecker.TypecheckerException as e:
+            print(failure_message(e))
+            status = "fail"
+        except SystemExit:
+            # the lexer and the parser print the error and exit
+            status = "fail"
+        except Exception:
+            traceback.print_exc()
+            status = "error"
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def compile_file(path: str, options: dict = None) -> Tuple[str, str, str]:
+    with open(path, "r") as f:
+        string = f.read()
+    return compile_source(string, options)
+
+
+def compile_files(paths: List[str], workers: int = 1, options: dict = None) -> Iterator[Tuple[str, str, str]]:
+    # results are returned in the order of the paths, whatever the number of workers
+    if workers <= 1:
+        for path in paths:
+            yield compile_file(path, options)
+        return
+    # every worker process imports the parser once and then compiles files until the list is over
+    with multiprocessing.Pool(workers) as pool:
+        # small chunks keep the workers busy until the end, without paying a round trip for every file
+        yield from pool.imap(functools.partial(compile_file, options=options), paths,
+                             max(1, len(paths) // (workers * 4)))
+
+
+def write_output(path: str, content: str):
+    if content:
+        with open(path, "w") as f:
+            f.write(content)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def main():
+    # the options of main.py apply to every file
+    options = parse_compile_options(sys.argv[1:])
+    arguments = [argument for argument in sys.argv[1:] if not is_compile_option(argument)]
+    output_folder = "out"
+    workers = 1
+    while len(arguments) >= 2 and arguments[0] in ("-o", "-j"):
+        if arguments[0] == "-o":
+            output_folder = arguments[1]
+        else:
+            # 0 uses every core
+            workers = int(arguments[1]) or os.cpu_count()
+        arguments = arguments[2:]
+    if len(arguments) == 0:
+        print(f"Usage: {sys.argv[0]} [-o <output_folder>] [-j <workers>] [--no-peephole] [--inline-threshold=N] "
+              f"[--skip-dead-functions] <file_name | folder> ...")
+        return
+    sources = find_sources(arguments)
+    counts = {"ok": 0, "fail": 0, "error": 0}
+    start = time.perf_counter()
+    results = compile_files([source for source, name in sources], workers, options)
+    for (source, name), (status, stdout, stderr) in zip(sources, results):
+        counts[status] += 1
+        output = os.path.join(output_folder, name)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        write_output(output + OUTPUT_EXTENSION, stdout)
+        write_output(output + ERROR_EXTENSION, stderr)
+        print("{0:<5} {1}".format(status, source))
+    elapsed = time.perf_counter() - start
+    files_per_second = len(sources) / elapsed if elapsed > 0 else 0
+    print("{0} files, {1} ok, {2} fail, {3} error in {4:.3f} s, {5:.1f} files/s"
+          .format(len(sources), counts["ok"], counts["fail"], counts["error"], elapsed, files_per_second))
+
+
+if __name__ == "__main__":
+    main()
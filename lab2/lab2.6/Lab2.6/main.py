@@ -1,11 +1,15 @@
 import re
 import sys
+from typing import Iterator, List, Union
 
-from Parser.MyLexer import MyLexer, find_column
+from Parser.MyLexer import MyLexer, ColumnIndex
 from Parser.MyParser import MyParser
-from Generator import ExpressionProgram
+from Generator import ExpressionProgram, Peephole, Trac42Program
 import TypeChecker
 import Optimizer
+import VirtualMachine
+import Evaluator
+import AbstractSyntax
 
 
 def main():
@@ -23,86 +27,170 @@ def main():
         return"""
     string = """"""
     string = sys.stdin.read()
-    # remove comments
-    lines = ""
-    string = re.split(r'\r\n|\r|\n', string.strip())
-    for line in string:
-        start = re.search("//", line)
-        if start:
-            lines += line[:start.span()[0]] + "\n"
-        else:
-            lines += line + "\n"
-    # ---------------------------------------------------
-    del line
-    del start
-    string = lines
-    del lines
+    string = remove_comments(string)
+    try:
+        if "--evaluate" in sys.argv[1:]:
+            # interpret the typechecked source without compiling it
+            evaluate_program(string)
+            return
+        compiled_program = compile_program(string, **parse_compile_options(sys.argv[1:]))
+        del string
+        if compiled_program is not None:
+            if "--run" in sys.argv[1:]:
+                # execute the program instead of printing it
+                VirtualMachine.Trac42VM(compiled_program).run()
+            else:
+                # print the optimized assembly Trac42 code, followed by an empty line
+                compiled_program.write(sys.stdout)
+                print()
+        del compiled_program
+    except TypeChecker.TypecheckerException as e:
+        print(failure_message(e))
+    """try:
+        abstract_syntax_tree.evaluate()
+    except EvaluatorException as e:
+        print(e)"""
+
+
+def failure_message(e: "TypeChecker.TypecheckerException") -> str:
+    error = str(e)
+    result = re.search(r'[0-9]+', error)
+    line = ""
+    column = ""
+    if result is not None:
+        line = error[result.start():result.end()]
+        error = error[result.end():]
+        result = re.search(r'[0-9]+', error)
+        if result is not None:
+            column = error[result.start():result.end()]
+    return "fail {0} {1} {2}".format(line, column, str(e))
+
+
+NO_PEEPHOLE_OPTION = "--no-peephole"
+INLINE_THRESHOLD_OPTION = "--inline-threshold="
+SKIP_DEAD_FUNCTIONS_OPTION = "--skip-dead-functions"
+# a line ending, with the comment that ends the line if there is one
+COMMENT_AND_NEWLINE = re.compile(r'(?://[^\r\n]*)?(?:\r\n|\r|\n)')
+
+
+def remove_comments(string: str) -> str:
+    # every line ending becomes \n, the source always ends with one
+    return COMMENT_AND_NEWLINE.sub("\n", string.strip() + "\n")
+
+
+def compile_program(string: str, peephole: bool = True, inline_threshold: int = Optimizer.INLINE_THRESHOLD,
+                    skip_dead_functions: bool = False) -> Union[Trac42Program, None]:
+    abstract_syntax_tree = parse(lex(string))[0]
+    if abstract_syntax_tree == "":
+        return None
+    return compile_tree(abstract_syntax_tree, peephole, inline_threshold, skip_dead_functions)
+
+
+def parse_inline_threshold(arguments: List[str]) -> int:
+    # --inline-threshold=N inlines the calls to functions of at most N instructions, 0 inlines no call
+    for argument in arguments:
+        if argument.startswith(INLINE_THRESHOLD_OPTION):
+            return int(argument[len(INLINE_THRESHOLD_OPTION):])
+    return Optimizer.INLINE_THRESHOLD
+
+
+def parse_compile_options(arguments: List[str]) -> dict:
+    # the keyword arguments of compile_program given on the command line, the other arguments are left to the caller
+    # the peephole pass can be disabled to look at the code as it is generated
+    # functions main never reaches can be left out before they are typechecked
+    return {"peephole": NO_PEEPHOLE_OPTION not in arguments,
+            "inline_threshold": parse_inline_threshold(arguments),
+            "skip_dead_functions": SKIP_DEAD_FUNCTIONS_OPTION in arguments}
+
+
+def is_compile_option(argument: str) -> bool:
+    return argument in (NO_PEEPHOLE_OPTION, SKIP_DEAD_FUNCTIONS_OPTION) or argument.startswith(INLINE_THRESHOLD_OPTION)
+
+
+def remove_dead_functions(abstract_syntax_tree: "AbstractSyntax.Statement") -> "AbstractSyntax.Statement":
+    # only the functions main reaches through its calls are kept
+    if type(abstract_syntax_tree) != AbstractSyntax.SequenceStatement:
+        return abstract_syntax_tree
+    statements = abstract_syntax_tree.get_statements()
+    reachable = Optimizer.CallGraph(statements).reachable()
+    return AbstractSyntax.SequenceStatement([statement for statement in statements
+                                             if type(statement) != AbstractSyntax.FunctionDeclaration or
+                                             statement.get_name() in reachable])
+
+
+def compile_tree(abstract_syntax_tree: "AbstractSyntax.Statement", peephole: bool = True,
+                 inline_threshold: int = Optimizer.INLINE_THRESHOLD,
+                 skip_dead_functions: bool = False) -> Trac42Program:
+    if skip_dead_functions:
+        # the errors of the functions that are never called are not reported
+        abstract_syntax_tree = remove_dead_functions(abstract_syntax_tree)
+    abstract_syntax_tree.prepass()
+    abstract_syntax_tree.typecheck()
+    functions = [abstract_syntax_tree]
+    if type(abstract_syntax_tree) == AbstractSyntax.SequenceStatement:
+        functions = abstract_syntax_tree.get_statements()
+    optimizer = Optimizer.ProgramOptimizer(functions)
+    optimizer.run()
+    for message in optimizer.get_warnings():
+        sys.stderr.write(message+"\n")
+    variables_first_use = optimizer.first_uses
+    decls_count = optimizer.decls_count
+    del optimizer
+    # print the optimized source code
+    # print(str(abstract_syntax_tree))
+    # necessary only to obtain the function list from the typecheking state
+    unused, type_checking_state = abstract_syntax_tree.typecheck()
+    call_graph = Optimizer.CallGraph(functions)
+    reachable = call_graph.reachable()
+    functions = {}
+    for name in type_checking_state.get_all_functions():
+        if name in reachable:
+            functions[name] = type_checking_state.lookup_function(name)
+    del type_checking_state
+    del abstract_syntax_tree
+    # calls to small functions are compiled in place, a function no longer called by a BSR is not emitted
+    inlined = Optimizer.Inliner(functions, decls_count, inline_threshold).run()
+    program = ExpressionProgram(functions, decls_count, inlined, call_graph.reachable("main", inlined))
+    del call_graph
+    compiled_program = program.compile(variables_first_use)
+    del program
+    del variables_first_use
+    del decls_count
+    if peephole:
+        compiled_program = Peephole().optimize(compiled_program)
+    compiled_program.link()
+    return compiled_program
+
+
+def evaluate_program(string: str):
     abstract_syntax_tree = parse(lex(string))[0]
-    del string
-    if abstract_syntax_tree != "":
-        abstract_syntax_tree.prepass()
-        try:
-            abstract_syntax_tree.typecheck()
-            state = Optimizer.OptimizerState()
-            while True:
-                state.new_scope()
-                abstract_syntax_tree.optimize(state)
-                state.assign_constants_to_delete()
-                if not state.start_again:
-                    break
-            for message in state.get_warnings():
-                sys.stderr.write(message+"\n")
-            variables_first_use = state.first_uses
-            del state
-            # print the optimized source code
-            # print(str(abstract_syntax_tree))
-            # necessary only to obtain the function list from the typecheking state
-            unused, type_checking_state = abstract_syntax_tree.typecheck()
-            functions = {}
-            for name in type_checking_state.get_all_functions():
-                functions[name] = type_checking_state.lookup_function(name)
-            del type_checking_state
-            decls_count = abstract_syntax_tree.get_decl_count()
-            del abstract_syntax_tree
-            program = ExpressionProgram(functions, decls_count)
-            compiled_program = program.compile(variables_first_use)
-            del program
-            del variables_first_use
-            del decls_count
-            compiled_program.link()
-            # print the optimized assembly Trac42 code
-            print(str(compiled_program))
-            del compiled_program
-        except TypeChecker.TypecheckerException as e:
-            error = str(e)
-            result = re.search(r'[0-9]+', error)
-            line = ""
-            column = ""
-            if result is not None:
-                line = error[result.start():result.end()]
-                error = error[result.end():]
-                result = re.search(r'[0-9]+', error)
-                if result is not None:
-                    column = error[result.start():result.end()]
-            print("fail {0} {1} {2}".format(line, column, str(e)))
-        """try:
-            abstract_syntax_tree.evaluate()
-        except EvaluatorException as e:
-            print(e)"""
-
-
-def lex(string: str) -> list:
+    if abstract_syntax_tree == "":
+        return
+    evaluate_tree(abstract_syntax_tree)
+
+
+def evaluate_tree(abstract_syntax_tree: "AbstractSyntax.Statement"):
+    abstract_syntax_tree.prepass()
+    unused, type_checking_state = abstract_syntax_tree.typecheck()
+    functions = {}
+    for name in type_checking_state.get_all_functions():
+        functions[name] = type_checking_state.lookup_function(name)
+    del type_checking_state
+    Evaluator.ClosureProgram(functions).run()
+
+
+def lex(string: str) -> Iterator:
+    # tokens are produced one at a time with their column, no token list is kept
     lexer = MyLexer()
-    token_list = []
+    column_index = ColumnIndex(string)
     for token in lexer.tokenize(string):
-        token.index = find_column(string, token)
-        token_list.append(token)
-    return token_list
+        token.index = column_index.find_column(token)
+        yield token
 
 
-def parse(token_list: list) -> tuple:
-    parser = MyParser(token_list)
-    return parser.parse(iter(token_list))
+def parse(tokens: Iterator) -> tuple:
+    parser = MyParser()
+    return parser.parse(tokens)
 
 
 if __name__ == "__main__":
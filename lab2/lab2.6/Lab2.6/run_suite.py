@@ -0,0 +1,71 @@
+# Runs the programs of a test suite with main.py on the virtual machine, with and without the peephole pass, without
+# inlining and with the unreached functions left out, and in the evaluator, and checks that every run prints the values
+# listed in the comment lines at the top of the program, run from the Lab2.6 folder with:
+#   python run_suite.py [folder_or_file ...]
+import os
+import subprocess
+import sys
+from typing import List
+
+LAB_FOLDER = os.path.dirname(os.path.abspath(__file__))
+TEST_SUITE_26 = os.path.normpath(os.path.join(LAB_FOLDER, "..", "test_suite_26"))
+# a program that does not stop within the time fails
+TIMEOUT = 20
+RUNS = [["--run"], ["--run", "--no-peephole"], ["--run", "--inline-threshold=0"], ["--run", "--skip-dead-functions"],
+        ["--evaluate"]]
+
+
+def expected_output(string: str) -> List[str]:
+    # the values listed in the comment lines before the code, split like the output is
+    values = []
+    for line in string.splitlines():
+        line = line.strip()
+        if not line.startswith("//"):
+            break
+        values.extend(line[2:].split())
+    return values
+
+
+def printed_output(string: str, options: List[str]) -> List[str]:
+    try:
+        result = subprocess.run([sys.executable, "main.py"] + options, input=string, capture_output=True, text=True,
+                                cwd=LAB_FOLDER, timeout=TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return ["no output after {0} s".format(TIMEOUT)]
+    return result.stdout.split()
+
+
+def check(path: str) -> bool:
+    with open(path, "r") as f:
+        string = f.read()
+    expected = expected_output(string)
+    passed = True
+    for options in RUNS:
+        printed = printed_output(string, options)
+        if printed != expected:
+            print("FAIL {0} {1}: printed {2}, expected {3}".format(os.path.basename(path), " ".join(options),
+                                                                   printed, expected))
+            passed = False
+    return passed
+
+
+def find_programs(paths: List[str]) -> List[str]:
+    programs = []
+    for path in paths:
+        if os.path.isdir(path):
+            programs.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".t42"))
+        else:
+            programs.append(path)
+    return programs
+
+
+def main():
+    programs = find_programs(sys.argv[1:] if len(sys.argv) > 1 else [TEST_SUITE_26])
+    failed = [path for path in programs if not check(path)]
+    print("{0} programs, {1} failed".format(len(programs), len(failed)))
+    if len(failed) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()